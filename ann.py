@@ -0,0 +1,109 @@
+import json
+import os
+
+import numpy as np
+from scipy import sparse
+
+# IVF (inverted-file) index over the l2-normalized TF-IDF rows of retriever.QAIndex.
+# Rows are projected to `dims` dimensions with TruncatedSVD, re-normalized and clustered with
+# MiniBatchKMeans into `nlist` lists. A query probes the `nprobe` lists whose centroids are
+# closest to its own projection; the pairs in those lists are then re-scored exactly, so
+# nprobe trades recall against latency (nprobe = nlist is the exact search). Recall also needs
+# enough SVD dimensions to keep the base's topics apart (dims of the order of the topic count).
+# scikit-learn is only needed to build the index, not to query it.
+
+IVF_DIMS = 256
+IVF_NPROBE = 8
+IVF_TRAIN_SIZE = 100_000
+
+
+def _normalize(X: np.ndarray) -> np.ndarray:
+    norms = np.sqrt((X * X).sum(axis=1, keepdims=True))
+    return X / np.where(norms > 0, norms, 1.0)
+
+
+class IVFIndex:
+    def __init__(self, components: np.ndarray, centroids: np.ndarray, assign: np.ndarray, nprobe: int = IVF_NPROBE):
+        self.components = np.asarray(components, dtype=np.float32)  # (dims, n_terms)
+        self._basis = np.ascontiguousarray(self.components.T)       # (n_terms, dims) for sparse @ dense
+        self.centroids = np.asarray(centroids, dtype=np.float32)    # (nlist, dims), unit rows
+        self.assign = np.asarray(assign, dtype=np.int32)            # list of every pair
+        self.nprobe = int(nprobe)
+        self._lists: tuple[np.ndarray, np.ndarray] | None = None
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, rows: sparse.csr_matrix, dims: int = IVF_DIMS, nlist: int | None = None,
+              nprobe: int = IVF_NPROBE, train_size: int = IVF_TRAIN_SIZE, seed: int = 0):
+        from sklearn.cluster import MiniBatchKMeans
+        from sklearn.decomposition import TruncatedSVD
+
+        n = rows.shape[0]
+        rng = np.random.default_rng(seed)
+        train = rows[np.sort(rng.choice(n, min(n, train_size), replace=False))] if n > train_size else rows
+        dims = max(1, min(dims, rows.shape[1] - 1, train.shape[0] - 1))
+        svd = TruncatedSVD(dims, algorithm="randomized", random_state=seed).fit(train)
+        index = cls(svd.components_, np.zeros((0, dims)), np.zeros(0), nprobe)
+        nlist = int(nlist or max(1, round(np.sqrt(n))))
+        km = MiniBatchKMeans(min(nlist, train.shape[0]), batch_size=4096, n_init=1, random_state=seed)
+        km.fit(index.project(train))
+        index.centroids = _normalize(km.cluster_centers_).astype(np.float32)
+        index.assign = index.nearest(rows)
+        return index
+
+    def project(self, rows: sparse.csr_matrix) -> np.ndarray:
+        # float32 on both sides, or scipy would upcast (copy) the whole basis per call
+        return _normalize(np.asarray(rows.astype(np.float32) @ self._basis))
+
+    def nearest(self, rows: sparse.csr_matrix, block: int = 65_536) -> np.ndarray:
+        out = np.empty(rows.shape[0], dtype=np.int32)
+        for start in range(0, rows.shape[0], block):
+            out[start:start + block] = (self.project(rows[start:start + block]) @ self.centroids.T).argmax(axis=1)
+        return out
+
+    def lists(self) -> tuple[np.ndarray, np.ndarray]:
+        # pair ids grouped by list, and the list offsets into them
+        if self._lists is None:
+            order = np.argsort(self.assign, kind="stable").astype(np.int64)
+            offsets = np.concatenate([[0], np.cumsum(np.bincount(self.assign, minlength=self.nlist))])
+            self._lists = order, offsets
+        return self._lists
+
+    def candidates(self, queries: sparse.csr_matrix, nprobe: int | None = None) -> list[np.ndarray]:
+        nprobe = min(int(nprobe or self.nprobe), self.nlist)
+        sims = self.project(queries) @ self.centroids.T
+        probe = np.argpartition(-sims, nprobe - 1, axis=1)[:, :nprobe] if nprobe < self.nlist else \
+            np.broadcast_to(np.arange(self.nlist), sims.shape)
+        order, offsets = self.lists()
+        return [np.concatenate([order[offsets[c]:offsets[c + 1]] for c in lists]) for lists in probe]
+
+    # --- incremental updates (the lists follow QAIndex.add/remove; centroids stay fixed) ---
+
+    def add(self, rows: sparse.csr_matrix) -> None:
+        if rows.shape[1] > self.components.shape[1]:
+            # terms first seen after the build have no SVD direction
+            rows = rows[:, :self.components.shape[1]]
+        self.assign = np.concatenate([self.assign, self.nearest(rows)])
+        self._lists = None
+
+    def remove(self, i: int) -> None:
+        self.assign = np.delete(self.assign, i)
+        self._lists = None
+
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        for name in ("components", "centroids", "assign"):
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, "ivf.json"), "w", encoding="utf-8") as f:
+            json.dump({"nprobe": self.nprobe}, f)
+
+    @classmethod
+    def load(cls, directory: str):
+        with open(os.path.join(directory, "ivf.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = [np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+                  for name in ("components", "centroids", "assign")]
+        return cls(*arrays, nprobe=meta.get("nprobe", IVF_NPROBE))
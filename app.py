@@ -1,4 +1,4 @@
-import json, os
+import hashlib
 import math
 import plotly.graph_objects as go
 import pandas as pd
@@ -9,12 +9,19 @@ from model import (
     MATERIALS,
     ShieldLayer,
     dose,
-    dose_curve,
+    cached_dose_curve,
+    CURVE_CACHE,
+    mu_version,
     classify_zone,
-    _mu_for,
+    mu_values,
+    attenuation_array,
+    recommended_thickness,
+    zone_radii,
     DANGEROUS_COMBINATIONS,
 )
-from retriever import QAIndex
+from scenario_store import open_store
+from optimizer import optimize_stack
+from montecarlo import simulate
 
 TEXTS = {
     "RU": {
@@ -34,17 +41,21 @@ TEXTS = {
         "scenario_name": "Название сценария",
         "author_label": "Автор",
         "note_label": "Заметка",
+        "half_life_label": "Период полураспада источника (ч, 0 — без распада)",
         "save_scenario": "Сохранить сценарий",
-        "scenario_saved": "Сценарий сохранён в scenarios/my_scenarios.json",
+        "scenario_saved": "Сценарий сохранён в scenarios/scenarios.db",
         "scenario_save_error": "Ошибка сохранения",
         "current_point": "Текущая точка",
         "Dr_metric_label": "D(r) (отн.)",
         "zone_green": "Зелёная зона (≤ D_safe)",
         "zone_yellow": "Жёлтая зона (между D_safe и 3·D_safe)",
         "zone_red": "Красная зона (> 3·D_safe)",
+        "safe_radius_label": "Безопасное расстояние r_safe (м)",
+        "zone_bounds": "Жёлтая зона: {r_red:.2f}–{r_safe:.2f} м, красная — ближе {r_red:.2f} м",
         "caption_model": "Модель учебная: 1/r² · exp(−Σ μ·x). Коэффициенты и единицы — относительные.",
         "chart_title": "График D(r)",
         "ylog_checkbox": "Логарифмическая шкала по D",
+        "export_png_prepare": "Подготовить PNG графика D(r)",
         "export_png_button": "Скачать график D(r) как PNG",
         "export_png_unavailable": "Экспорт PNG недоступен",
         "export_csv_button": "Скачать данные D(r) как CSV",
@@ -59,21 +70,34 @@ TEXTS = {
         "material_visualization_caption": "Слои экрана отображаются по толщине (см).",
         "material_visualization_empty": "Добавьте слой, чтобы увидеть визуализацию.",
         "rad_animation_title": "Анимация излучения",
+        "rad_animation_show": "Показать анимацию",
         "rad_animation_caption": "Наглядная схема прохождения выбранного излучения сквозь экран.",
         "recommendations_header": "Рекомендации по толщине материалов",
         "recommendations_caption": "Толщина для достижения безопасной дозы на текущем расстоянии.",
         "recommendations_material": "Материал",
         "recommendations_thickness": "Толщина (см)",
         "recommendations_not_needed": "Дополнительное экранирование не требуется",
+        "optimizer_stack": "Самый дешёвый пакет (до 3 слоёв, условные цены): {stack} — стоимость {cost:.2f}",
+        "optimizer_none": "Подходящего пакета не найдено",
+        "engine_label": "Модель расчёта",
+        "engine_options": ["Аналитика (узкий пучок)", "Монте-Карло (с рассеянием)"],
+        "mc_histories": "Число историй Монте-Карло",
+        "buildup_label": "Учитывать фактор накопления (рассеяние)",
+        "buildup_help": "Фактор накопления B(μx) по Тейлору для материала последнего слоя; коэффициенты — data/buildup.json",
+        "mc_result": "Монте-Карло: пропускание {t:.3e} ± {err:.1e} (фактор накопления B = {b:.2f}), {n:,} историй за {s:.2f} с ({rate:,.0f} ист./с)",
+        "mc_unresolved": "Монте-Карло не разрешил пропускание ({t:.1e} ± {err:.1e} по {n:,} историям): экран слишком толстый для этого числа историй. Показана аналитическая оценка с фактором накопления, а не безопасная зона по нулевому счёту.",
         "safety_header": "Предупреждения по безопасности",
         "safety_warning_prefix": "Внимание:",
         "dangerous_combination_intro": "Проверьте совместимость выбранных материалов.",
         "ask_assistant_header": "Спросить ассистента (локальная база знаний)",
         "ask_placeholder": "Введите вопрос (пример: «Что такое правило время–расстояние–экранирование?»)",
         "assistant_empty": "База знаний не загружена или пуста.",
+        "assistant_no_match": "В базе знаний нет похожего вопроса — попробуйте переформулировать.",
         "assistant_nearest_question": "Ближайший вопрос:",
         "assistant_similarity": "Сходство (TF-IDF)",
-        "version_caption": "Версия каркаса: 1.4, интерактивная формула, визуализации, RU/EN/ZH"
+        "version_caption": "Версия каркаса: 1.4, интерактивная формула, визуализации, RU/EN/ZH",
+        "curve_cache_stats": "Кэш кривых D(r): попаданий {hits}, промахов {misses}, записей {entries}",
+        "qa_cache_stats": "Кэш ответов ассистента: попаданий {hits}, промахов {misses} ({hit_rate:.0%}), записей {entries}"
     },
     "EN": {
         "page_title": "Shielding & Dose — Simulator",
@@ -92,17 +116,21 @@ TEXTS = {
         "scenario_name": "Scenario name",
         "author_label": "Author",
         "note_label": "Note",
+        "half_life_label": "Source half-life (h, 0 = no decay)",
         "save_scenario": "Save scenario",
-        "scenario_saved": "Scenario saved to scenarios/my_scenarios.json",
+        "scenario_saved": "Scenario saved to scenarios/scenarios.db",
         "scenario_save_error": "Save error",
         "current_point": "Current point",
         "Dr_metric_label": "D(r) (rel.)",
         "zone_green": "Green zone (≤ D_safe)",
         "zone_yellow": "Yellow zone (between D_safe and 3·D_safe)",
         "zone_red": "Red zone (> 3·D_safe)",
+        "safe_radius_label": "Safe distance r_safe (m)",
+        "zone_bounds": "Yellow zone: {r_red:.2f}–{r_safe:.2f} m, red closer than {r_red:.2f} m",
         "caption_model": "Educational model: 1/r² · exp(−Σ μ·x). Coefficients and units are relative.",
         "chart_title": "D(r) curve",
         "ylog_checkbox": "Logarithmic scale for D",
+        "export_png_prepare": "Prepare D(r) chart as PNG",
         "export_png_button": "Download D(r) chart as PNG",
         "export_png_unavailable": "PNG export not available",
         "export_csv_button": "Download D(r) data as CSV",
@@ -117,21 +145,34 @@ TEXTS = {
         "material_visualization_caption": "Shield layers are scaled by their thickness (cm).",
         "material_visualization_empty": "Add a layer to see the visualization.",
         "rad_animation_title": "Radiation animation",
+        "rad_animation_show": "Show animation",
         "rad_animation_caption": "Animated path of the selected radiation through the shield.",
         "recommendations_header": "Material thickness recommendations",
         "recommendations_caption": "Thickness needed to reach the safe dose at the current distance.",
         "recommendations_material": "Material",
         "recommendations_thickness": "Thickness (cm)",
         "recommendations_not_needed": "No extra shielding required",
+        "optimizer_stack": "Cheapest stack (up to 3 layers, unit costs): {stack} — cost {cost:.2f}",
+        "optimizer_none": "No suitable stack found",
+        "engine_label": "Dose model",
+        "engine_options": ["Analytic (narrow beam)", "Monte Carlo (with scattering)"],
+        "mc_histories": "Monte Carlo histories",
+        "buildup_label": "Include buildup factor (scattering)",
+        "buildup_help": "Taylor buildup factor B(μx) for the exit-layer material; coefficients in data/buildup.json",
+        "mc_result": "Monte Carlo: transmission {t:.3e} ± {err:.1e} (buildup B = {b:.2f}), {n:,} histories in {s:.2f} s ({rate:,.0f} hist/s)",
+        "mc_unresolved": "Monte Carlo did not resolve the transmission ({t:.1e} ± {err:.1e} from {n:,} histories): the shield is too thick for this many histories. Showing the analytic estimate with buildup instead of a safe zone from a zero tally.",
         "safety_header": "Safety warnings",
         "safety_warning_prefix": "Caution:",
         "dangerous_combination_intro": "Verify compatibility of the chosen materials.",
         "ask_assistant_header": "Ask the assistant (offline knowledge base)",
         "ask_placeholder": "Type a question (e.g., “What is time–distance–shielding rule?”)",
         "assistant_empty": "Knowledge base is not loaded or empty.",
+        "assistant_no_match": "No similar question in the knowledge base, try rephrasing.",
         "assistant_nearest_question": "Nearest question:",
         "assistant_similarity": "Similarity (TF-IDF)",
-        "version_caption": "Framework version: 1.4, interactive formula, visualizations, RU/EN/ZH"
+        "version_caption": "Framework version: 1.4, interactive formula, visualizations, RU/EN/ZH",
+        "curve_cache_stats": "D(r) curve cache: {hits} hits, {misses} misses, {entries} entries",
+        "qa_cache_stats": "Assistant answer cache: {hits} hits, {misses} misses ({hit_rate:.0%}), {entries} entries"
     },
     "ZH": {
         "page_title": "屏蔽与剂量模拟器",
@@ -150,17 +191,21 @@ TEXTS = {
         "scenario_name": "情景名称",
         "author_label": "作者",
         "note_label": "备注",
+        "half_life_label": "源的半衰期 (小时，0 表示不衰变)",
         "save_scenario": "保存情景",
-        "scenario_saved": "情景已保存到 scenarios/my_scenarios.json",
+        "scenario_saved": "情景已保存到 scenarios/scenarios.db",
         "scenario_save_error": "保存错误",
         "current_point": "当前点",
         "Dr_metric_label": "D(r) (相对)",
         "zone_green": "绿色区域 (≤ D_safe)",
         "zone_yellow": "黄色区域 (介于 D_safe 与 3·D_safe)",
         "zone_red": "红色区域 (> 3·D_safe)",
+        "safe_radius_label": "安全距离 r_safe (米)",
+        "zone_bounds": "黄色区域：{r_red:.2f}–{r_safe:.2f} 米，红色区域：小于 {r_red:.2f} 米",
         "caption_model": "教学模型: 1/r² · exp(−Σ μ·x)。系数和单位均为相对值。",
         "chart_title": "D(r) 曲线",
         "ylog_checkbox": "对数坐标 (D)",
+        "export_png_prepare": "生成 D(r) 曲线 PNG",
         "export_png_button": "下载 D(r) 曲线 PNG",
         "export_png_unavailable": "无法导出 PNG",
         "export_csv_button": "下载 D(r) 数据 CSV",
@@ -175,21 +220,34 @@ TEXTS = {
         "material_visualization_caption": "根据厚度(厘米)显示各屏蔽层。",
         "material_visualization_empty": "添加屏蔽层以查看可视化。",
         "rad_animation_title": "辐射动画",
+        "rad_animation_show": "显示动画",
         "rad_animation_caption": "展示所选辐射穿过屏蔽的示意动画。",
         "recommendations_header": "材料厚度建议",
         "recommendations_caption": "在当前距离达到安全剂量所需的厚度。",
         "recommendations_material": "材料",
         "recommendations_thickness": "厚度 (厘米)",
         "recommendations_not_needed": "无需额外屏蔽",
+        "optimizer_stack": "最便宜的屏蔽组合（最多 3 层，单位成本）：{stack} — 成本 {cost:.2f}",
+        "optimizer_none": "未找到合适的屏蔽组合",
+        "engine_label": "计算模型",
+        "engine_options": ["解析 (窄束)", "蒙特卡罗 (含散射)"],
+        "mc_histories": "蒙特卡罗历史数",
+        "buildup_label": "计入积累因子 (散射)",
+        "buildup_help": "按最外层材料的泰勒积累因子 B(μx)；系数见 data/buildup.json",
+        "mc_result": "蒙特卡罗：透射率 {t:.3e} ± {err:.1e} (积累因子 B = {b:.2f})，{n:,} 个历史用时 {s:.2f} 秒 ({rate:,.0f} 历史/秒)",
+        "mc_unresolved": "蒙特卡罗未能解析透射率 ({n:,} 个历史得到 {t:.1e} ± {err:.1e})：对此历史数而言屏蔽太厚。改为显示含积累因子的解析估计，而不是根据零计数给出安全区。",
         "safety_header": "安全警示",
         "safety_warning_prefix": "注意:",
         "dangerous_combination_intro": "请检查所选材料的兼容性。",
         "ask_assistant_header": "询问助手 (离线知识库)",
         "ask_placeholder": "输入问题 (例如：“什么是时间-距离-屏蔽原则？”)",
         "assistant_empty": "知识库未加载或为空。",
+        "assistant_no_match": "知识库中没有相似的问题，请换一种说法。",
         "assistant_nearest_question": "最接近的问题:",
         "assistant_similarity": "相似度 (TF-IDF)",
-        "version_caption": "框架版本: 1.4，交互公式，可视化，支持 RU/EN/ZH"
+        "version_caption": "框架版本: 1.4，交互公式，可视化，支持 RU/EN/ZH",
+        "curve_cache_stats": "D(r) 曲线缓存：命中 {hits}，未命中 {misses}，条目 {entries}",
+        "qa_cache_stats": "助手回答缓存：命中 {hits}，未命中 {misses} ({hit_rate:.0%})，条目 {entries}"
     }
 }
 
@@ -324,41 +382,40 @@ def get_radiation_options(lang: str) -> tuple[list[str], list[str]]:
 
 
 def compute_total_attenuation(layers: list[ShieldLayer], radiation_type: str) -> tuple[float, list[tuple[str, float, float, float]]]:
-    terms = []
-    total = 0.0
-    for layer in layers:
-        mu = _mu_for(layer.material, radiation_type)
-        contribution = mu * max(layer.thickness_cm, 0.0)
-        if layer.thickness_cm > 0:
-            terms.append((layer.material, mu, layer.thickness_cm, contribution))
-        total += contribution
-    return total, terms
+    mus = mu_values([layer.material for layer in layers], radiation_type)
+    thicknesses = np.array([layer.thickness_cm for layer in layers], dtype=float)
+    contributions = mus * np.maximum(thicknesses, 0.0)
+    terms = [
+        (layer.material, float(mu), layer.thickness_cm, float(contribution))
+        for layer, mu, contribution in zip(layers, mus, contributions)
+        if layer.thickness_cm > 0
+    ]
+    return float(contributions.sum()), terms
 
 
-def compute_recommendations(k: float, r_current: float, D_safe: float, radiation_type: str, lang: str) -> pd.DataFrame:
-    records = []
+@st.cache_data(max_entries=256)
+def compute_recommendations(k: float, r_current: float, D_safe: float, radiation_type: str, lang: str, mu_rev: int = 0,
+                            buildup: bool = False) -> pd.DataFrame:
+    # mu_rev only keys the cache so a new μ override invalidates old tables
     if k <= 0:
         return pd.DataFrame(columns=[T(lang, "recommendations_material"), T(lang, "recommendations_thickness")])
-    target = D_safe * (r_current ** 2) / k
-    for material in MATERIALS.keys():
-        mu = _mu_for(material, radiation_type)
-        if mu <= 0:
-            thickness = float("nan")
-        elif target >= 1:
-            thickness = 0.0
-        else:
-            thickness = max(0.0, -math.log(target) / mu)
-        records.append({
-            T(lang, "recommendations_material"): material,
-            T(lang, "recommendations_thickness"): thickness if thickness >= 0 else float("nan"),
-        })
-    df = pd.DataFrame(records)
+    materials = list(MATERIALS.keys())
+    thickness = recommended_thickness(k, r_current, D_safe, radiation_type, materials, buildup=buildup)
+    df = pd.DataFrame({
+        T(lang, "recommendations_material"): materials,
+        T(lang, "recommendations_thickness"): thickness,
+    })
     df[T(lang, "recommendations_thickness")] = df[T(lang, "recommendations_thickness")].map(
         lambda x: "—" if pd.isna(x) else f"{x:.2f}"
     )
     return df
 
 
+@st.cache_data(max_entries=32, show_spinner=False)
+def run_monte_carlo(layers: list[ShieldLayer], radiation_type: str, histories: int, mu_rev: int = 0):
+    return simulate(layers, radiation_type, histories=histories)
+
+
 def build_material_figure(layers: list[ShieldLayer], lang: str) -> go.Figure:
     fig = go.Figure()
     for layer in layers:
@@ -389,6 +446,7 @@ def build_material_figure(layers: list[ShieldLayer], lang: str) -> go.Figure:
     return fig
 
 
+@st.cache_data(max_entries=64)
 def build_radiation_animation(layers: list[ShieldLayer], radiation_type: str, lang: str) -> go.Figure:
     settings = RAD_ANIMATION_SETTINGS.get(radiation_type, RAD_ANIMATION_SETTINGS["Гамма"])
     total_thickness = sum(max(layer.thickness_cm, 0.0) for layer in layers)
@@ -497,13 +555,11 @@ if "r_eval" not in st.session_state:
     st.session_state["r_eval"] = float(st.session_state[PARAM_CONFIG["r"]["value"]])
 
 @st.cache_resource
-def load_qa_index():
-    try:
-        return QAIndex.from_csv("data/qa.csv")
-    except Exception:
-        return QAIndex([])
-
-qa_index = load_qa_index()
+def load_qa_router():
+    # imported here, not at startup: retriever pulls in scipy, and most sessions never ask.
+    # Per-language indexes are loaded on the first question in that language
+    from retriever import QARouter
+    return QARouter()
 
 st.sidebar.header(T(lang, "sidebar_header"))
 rad_labels, rad_values = get_radiation_options(lang)
@@ -550,12 +606,29 @@ for i in range(int(layer_count)):
         th = st.number_input(f"{T(lang, 'thickness_layer')} {i+1}", 0.0, 50.0, 0.0, 0.5, key=f"th_{i}")
     layers.append(ShieldLayer(material=mat, thickness_cm=th))
 
+engine_labels = T(lang, "engine_options")
+use_mc = st.sidebar.radio(T(lang, "engine_label"), engine_labels, index=0) == engine_labels[1]
+use_buildup = False
+mc = None
+mc_unresolved = None
+if not use_mc:
+    use_buildup = st.sidebar.checkbox(T(lang, "buildup_label"), value=False, help=T(lang, "buildup_help"))
+else:
+    mc_histories = st.sidebar.select_slider(T(lang, "mc_histories"), [10_000, 50_000, 100_000, 500_000, 1_000_000], value=100_000)
+    mc = run_monte_carlo(layers, rad_type, mc_histories, mu_version())
+    if not mc.resolved:
+        # nothing (or too little) got through: a zero tally is not a safe shield, so use the
+        # analytic attenuation with buildup instead
+        mc_unresolved, mc = mc, None
+        use_buildup = True
+
 st.sidebar.divider()
 st.sidebar.subheader(T(lang, "scenarios_subheader"))
 default_name = "Сценарий 1" if lang == "RU" else ("Scenario 1" if lang == "EN" else "情景 1")
 scenario_name = st.sidebar.text_input(T(lang, "scenario_name"), value=default_name)
 author = st.sidebar.text_input(T(lang, "author_label"), value="")
 note = st.sidebar.text_area(T(lang, "note_label"), value="")
+half_life_h = st.sidebar.number_input(T(lang, "half_life_label"), 0.0, 1e6, 0.0, 1.0)
 if st.sidebar.button(T(lang, "save_scenario")):
     payload = {
         "k": float(k),
@@ -565,21 +638,13 @@ if st.sidebar.button(T(lang, "save_scenario")):
         "radiation_type": rad_type,
         "author": author,
         "note": note,
+        "half_life_h": float(half_life_h) if half_life_h > 0 else None,
         "saved_at": datetime.now().isoformat(timespec="seconds"),
         "lang": lang
     }
     try:
-        os_path = "scenarios/my_scenarios.json"
-        os.makedirs(os.path.dirname(os_path), exist_ok=True)
-        try:
-            with open(os_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception:
-            data = {}
         scenario_key = scenario_name if f"[{rad_type}]" in scenario_name else f"{scenario_name} [{rad_type}]"
-        data[scenario_key] = payload
-        with open(os_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        open_store().upsert(scenario_key, payload)
         st.sidebar.success(T(lang, "scenario_saved"))
     except Exception as e:
         st.sidebar.error(f"{T(lang, 'scenario_save_error')}: {e}")
@@ -639,7 +704,7 @@ else:
 latex_formula = rf"D(r) = \frac{{{k_formula_value:.2f}}}{{r^2}} \cdot \exp(-({mu_expr}))"
 st.latex(latex_formula)
 st.caption(f"{T(lang, 'formula_mu_label')}: {total_mu:.2f}")
-dose_at_eval = dose(k_formula_value, r_eval_value, layers, radiation_type=rad_type)
+dose_at_eval = float(mc.dose(k_formula_value, r_eval_value)) if mc else dose(k_formula_value, r_eval_value, layers, radiation_type=rad_type, buildup=use_buildup)
 st.metric(T(lang, "formula_result_label"), f"{dose_at_eval:.3f}")
 if mu_terms:
     breakdown_lines = [
@@ -653,7 +718,7 @@ if mu_terms:
 colA, colB = st.columns([1, 2])
 
 with colA:
-    D_now = dose(k, r_current, layers, radiation_type=rad_type)
+    D_now = float(mc.dose(k, r_current)) if mc else dose(k, r_current, layers, radiation_type=rad_type, buildup=use_buildup)
     zone = classify_zone(D_now, D_safe)
     st.markdown("### " + T(lang, "current_point"))
     st.metric(label=T(lang, "Dr_metric_label"), value=f"{D_now:.3f}")
@@ -663,16 +728,38 @@ with colA:
         st.warning(T(lang, "zone_yellow"))
     else:
         st.error(T(lang, "zone_red"))
+    if mc:
+        att_now = mc.transmission
+    elif use_buildup:
+        att_now = float(attenuation_array([L.material for L in layers], [L.thickness_cm for L in layers], rad_type, buildup=True))
+    else:
+        att_now = math.exp(-total_mu)
+    r_safe, r_red = zone_radii(k, att_now, D_safe)
+    st.metric(label=T(lang, "safe_radius_label"), value=f"{float(r_safe):.2f}")
+    st.caption(T(lang, "zone_bounds").format(r_safe=float(r_safe), r_red=float(r_red)))
     st.caption(T(lang, "caption_model"))
+    if mc_unresolved:
+        st.warning(T(lang, "mc_unresolved").format(t=mc_unresolved.transmission, err=mc_unresolved.std_err,
+                                                   n=mc_unresolved.histories))
+    if mc:
+        st.caption(T(lang, "mc_result").format(t=mc.transmission, err=mc.std_err, b=mc.buildup,
+                                               n=mc.histories, s=mc.seconds, rate=mc.histories_per_s))
 
 with colB:
     st.markdown("### " + T(lang, "chart_title"))
     r_min, r_max = 0.1, 10.0
-    r, d = dose_curve(k, layers, r_min, r_max, num=400, radiation_type=rad_type)
+    r, d = cached_dose_curve(k, layers, r_min, r_max, num=400, radiation_type=rad_type, buildup=use_buildup)
     ylog = st.checkbox(T(lang, "ylog_checkbox"), value=False)
     fig = go.Figure()
+    if mc:
+        d_err = mc.dose_err(k, r)
+        d = mc.dose(k, r)
+        fig.add_scatter(x=np.concatenate([r, r[::-1]]), y=np.concatenate([d + 2 * d_err, (d - 2 * d_err)[::-1]]),
+                        fill="toself", line=dict(width=0), fillcolor="rgba(31,119,180,0.2)", hoverinfo="skip", showlegend=False)
     fig.add_scatter(x=r, y=d, mode="lines", name="D(r)")
     fig.add_hline(y=D_safe, line_dash="dot", annotation_text="D_safe")
+    if r_min <= float(r_safe) <= r_max:
+        fig.add_vline(x=float(r_safe), line_dash="dot", line_color="#2e7d32", annotation_text="r_safe")
     fig.add_vline(x=r_eval_value, line_dash="dash", line_color="#888888", annotation_text=f"r={r_eval_value:.2f}")
     x_title = {
         "EN": "Distance r (m)",
@@ -686,12 +773,18 @@ with colB:
     if ylog:
         fig.update_yaxes(type="log", exponentformat="power")
     st.plotly_chart(fig, use_container_width=True)
-    try:
-        png_bytes = fig.to_image(format="png", scale=2)
-        st.download_button(T(lang, "export_png_button"), data=png_bytes,
+    # kaleido starts a browser per render: only on request, never on every rerun. The PNG stays in
+    # session_state with the figure it shows, so the download button survives later reruns
+    fig_key = hashlib.sha1(fig.to_json().encode("utf-8")).hexdigest()
+    if st.button(T(lang, "export_png_prepare")):
+        try:
+            st.session_state["png_dose_curve"] = (fig_key, fig.to_image(format="png", scale=2))
+        except Exception as e:
+            st.caption(f"{T(lang, 'export_png_unavailable')}: {e}")
+    png = st.session_state.get("png_dose_curve")
+    if png and png[0] == fig_key:
+        st.download_button(T(lang, "export_png_button"), data=png[1],
                            file_name="dose_curve.png", mime="image/png")
-    except Exception as e:
-        st.caption(f"{T(lang, 'export_png_unavailable')}: {e}")
     df = pd.DataFrame({"r": r, "D": d})
     st.download_button(T(lang, "export_csv_button"), data=df.to_csv(index=False).encode("utf-8"),
                        file_name="dose_curve.csv", mime="text/csv")
@@ -708,16 +801,25 @@ with viz_col1:
 
 with viz_col2:
     st.markdown("#### " + T(lang, "rad_animation_title"))
-    anim_fig = build_radiation_animation(layers, rad_type, lang)
-    st.plotly_chart(anim_fig, use_container_width=True)
+    if st.checkbox(T(lang, "rad_animation_show"), value=False):
+        anim_fig = build_radiation_animation(layers, rad_type, lang)
+        st.plotly_chart(anim_fig, use_container_width=True)
     st.caption(T(lang, "rad_animation_caption"))
 
 st.markdown("### " + T(lang, "recommendations_header"))
 st.caption(T(lang, "recommendations_caption"))
-recommendations_df = compute_recommendations(k, r_current, D_safe, rad_type, lang)
+recommendations_df = compute_recommendations(k, r_current, D_safe, rad_type, lang, mu_version(), use_buildup)
 if k > 0 and (D_safe * (r_current ** 2) / k) >= 1:
     st.success(T(lang, "recommendations_not_needed"))
 st.table(recommendations_df)
+# the LP itself is narrow-beam; with buildup (or Monte Carlo, which tallies scatter too) the
+# design is tightened until it also meets D_safe with the buildup factor
+best_stack = optimize_stack(k, r_current, D_safe, rad_type, buildup=use_buildup or mc is not None)
+if not best_stack.feasible:
+    st.caption(T(lang, "optimizer_none"))
+elif best_stack.layers:
+    stack_txt = " + ".join(f"{L.material} {L.thickness_cm:.2f}" for L in best_stack.layers)
+    st.caption(T(lang, "optimizer_stack").format(stack=stack_txt, cost=best_stack.cost))
 
 warnings = check_hazards(layers, lang)
 if warnings:
@@ -730,9 +832,19 @@ st.divider()
 st.markdown("## " + T(lang, "ask_assistant_header"))
 query = st.text_input(T(lang, "ask_placeholder"))
 if query:
-    answers = qa_index.ask(query, topk=1)
+    qa_router = load_qa_router()
+    qa_index = qa_router.index(lang)
+    # every widget change reruns the script: reuse the last answer while the question and the
+    # index stay the same, and go through the shared query cache otherwise
+    memo_key = (lang, qa_index.version, query)
+    memo = st.session_state.get("qa_last")
+    if memo is not None and memo[0] == memo_key:
+        answers = memo[1]
+    else:
+        answers = qa_router.ask(query, lang, topk=1)
+        st.session_state["qa_last"] = (memo_key, answers)
     if not answers:
-        st.info(T(lang, "assistant_empty"))
+        st.info(T(lang, "assistant_no_match") if len(qa_index) else T(lang, "assistant_empty"))
     else:
         q, a, sim = answers[0]
         st.markdown(f"**{T(lang, 'assistant_nearest_question')}** {q}")
@@ -740,3 +852,6 @@ if query:
         st.caption(f"{T(lang, 'assistant_similarity')}: {sim:.2f}")
 
 st.caption(T(lang, "version_caption"))
+st.caption(T(lang, "curve_cache_stats").format(**CURVE_CACHE.stats()))
+if query:
+    st.caption(T(lang, "qa_cache_stats").format(**qa_router.cache.stats()))
@@ -0,0 +1,121 @@
+"""Cold-start budget of the Streamlit app: import time per page and time to first paint.
+
+    python -m benchmarks.cold_start                      # every page, fails if a budget is exceeded
+    python -m benchmarks.cold_start --pages app.py pages/compare.py --profile importtime.txt
+
+Each page's top-level imports (streamlit itself excluded: the server has loaded it before the
+first script run) are imported in a fresh interpreter under `python -X importtime`; the sum of
+the cumulative times of the top-level packages is checked against --budget-ms. Modules that
+only some features need (scikit-learn, scipy, kaleido, plotly.io) must not be imported at
+startup at all. When streamlit is installed, app.py is also executed once with
+streamlit.testing.AppTest and its first run is checked against --ttfp-s.
+"""
+import argparse
+import ast
+import glob
+import os
+import re
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_BUDGET_MS = 1000.0
+TTFP_BUDGET_S = 2.0
+# imported on first use only: the QA index (retriever → scipy), IVF builds, PNG export
+LAZY_MODULES = ("sklearn", "scipy", "kaleido", "plotly.io", "retriever", "ann")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def page_imports(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    mods = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            mods += [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            mods.append(node.module)
+    return [m for m in dict.fromkeys(mods) if m.split(".")[0] != "streamlit"]
+
+
+def import_profile(mods: list[str]) -> tuple[list[tuple[str, int, int]], str]:
+    # (package, cumulative µs, nesting depth) for every import, plus the raw -X importtime log
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + ", ".join(mods) if mods else "pass"],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(2)), (len(m.group(3)) - 1) // 2))
+    return rows, proc.stderr
+
+
+def first_paint(page: str) -> float:
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=60)
+    t0 = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - t0
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return elapsed
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(prog="python -m benchmarks.cold_start", description=__doc__.splitlines()[0])
+    p.add_argument("--pages", nargs="+", help="page scripts relative to the repo root (default: app.py and pages/*.py)")
+    p.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS, help="import time per page")
+    p.add_argument("--ttfp-s", type=float, default=TTFP_BUDGET_S, help="first run of app.py")
+    p.add_argument("--top", type=int, default=3, help="heaviest packages to list per page")
+    p.add_argument("--profile", help="write the raw -X importtime log of every page to this file")
+    args = p.parse_args(argv)
+
+    pages = args.pages or ["app.py"] + sorted(os.path.relpath(f, ROOT) for f in glob.glob(os.path.join(ROOT, "pages", "*.py")))
+    failures = []
+    logs = []
+    print(f"{'page':<24} {'import ms':>10}  heaviest")
+    for page in pages:
+        try:
+            mods = page_imports(os.path.join(ROOT, page))
+            rows, log = import_profile(mods)
+        except (OSError, SyntaxError, RuntimeError) as e:
+            failures.append(f"{page}: {e}")
+            continue
+        logs.append(f"# {page}\n{log}")
+        # top-level packages of the page only, not the interpreter's own startup (site, encodings)
+        roots = {m.split(".")[0] for m in mods}
+        top = sorted((r for r in rows if r[2] == 0 and r[0].split(".")[0] in roots), key=lambda r: -r[1])
+        total = sum(r[1] for r in top) / 1000
+        print(f"{page:<24} {total:>10.0f}  " + ", ".join(f"{name} {us / 1000:.0f}" for name, us, _ in top[:args.top]))
+        if total > args.budget_ms:
+            failures.append(f"{page}: imports take {total:.0f} ms > {args.budget_ms:.0f} ms")
+        eager = [m for m in LAZY_MODULES if any(name == m or name.startswith(m + ".") for name, _, _ in rows)]
+        if eager:
+            failures.append(f"{page}: imported at startup: {', '.join(eager)}")
+
+    if args.profile:
+        with open(args.profile, "w", encoding="utf-8") as f:
+            f.write("\n".join(logs))
+
+    if "app.py" in pages:
+        try:
+            ttfp = first_paint("app.py")
+        except ImportError:
+            print("time to first paint: skipped (streamlit is not installed)")
+        else:
+            print(f"time to first paint (app.py, AppTest): {ttfp:.2f} s (target {args.ttfp_s:.1f} s)")
+            if ttfp > args.ttfp_s:
+                failures.append(f"app.py: first run takes {ttfp:.2f} s > {args.ttfp_s:.1f} s")
+
+    for msg in failures:
+        print("FAIL", msg)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
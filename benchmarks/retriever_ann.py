@@ -0,0 +1,105 @@
+"""Recall/latency benchmark of the IVF backend (ann.py) against exact QAIndex search.
+
+    python -m benchmarks.retriever_ann                   # 1M questions, nprobe 1…64
+    python -m benchmarks.retriever_ann --n 100000 --topics 1000 --dims 128 --nprobe 2 8 32
+
+Synthetic FAQ: every question belongs to one of --topics topics and mixes topic terms with
+Zipf-distributed common words. Queries are corpus questions with a third of their words
+dropped, so the nearest pair is not always a verbatim duplicate. recall@k is the share of the
+exact top-k that the IVF search returns; pairs tied with the exact k-th score count as hits.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.retriever_topk import write_corpus
+from retriever import QAIndex
+
+
+def make_faq(directory: str, n: int, vocab: int, topics: int, seed: int) -> list[str]:
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(6, 15, n)
+    rows = np.repeat(np.arange(n), lengths)
+    topic = rng.integers(0, topics, n)[rows]
+    per_topic = 40
+    # 70% topic terms (a private slice of the vocabulary), 30% from a few hundred Zipf-ranked
+    # function words shared by all topics
+    topical = topic * per_topic % (vocab // 2) + vocab // 2 + rng.integers(0, per_topic, rows.size)
+    common = (rng.zipf(1.3, rows.size) - 1) % 300
+    terms = np.where(rng.random(rows.size) < 0.7, np.minimum(topical, vocab - 1), common)
+    return write_corpus(directory, rows, terms, n, vocab)
+
+
+def perturb(question: str, rng: np.random.Generator) -> str:
+    words = question.split()
+    drop = set(rng.choice(len(words), len(words) // 3, replace=False).tolist())
+    return " ".join(w for i, w in enumerate(words) if i not in drop)
+
+
+def recall(approx, exact, k: int) -> float:
+    hits = []
+    for a, e in zip(approx, exact):
+        e = e[:k]
+        if e:
+            kth = e[-1][2] - 1e-9
+            hits.append(min(sum(s >= kth for _, _, s in a[:k]), len(e)) / len(e))
+    return float(np.mean(hits)) if hits else 1.0
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(prog="python -m benchmarks.retriever_ann", description=__doc__.splitlines()[0])
+    p.add_argument("--n", type=int, default=1_000_000, help="questions in the synthetic corpus")
+    p.add_argument("--vocab", type=int, default=50_000)
+    p.add_argument("--topics", type=int, default=250)
+    p.add_argument("--queries", type=int, default=300)
+    p.add_argument("--topk", type=int, default=10)
+    p.add_argument("--dims", type=int, default=256)
+    p.add_argument("--nlist", type=int, help="IVF lists (default √n)")
+    p.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64])
+    p.add_argument("--train", type=int, default=100_000, help="rows sampled to fit SVD and k-means")
+    p.add_argument("--seed", type=int, default=11)
+    args = p.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        questions = make_faq(os.path.join(tmp, "index"), args.n, args.vocab, args.topics, args.seed)
+        t_gen = time.perf_counter() - t0
+        index = QAIndex.load(os.path.join(tmp, "index"))
+
+        t0 = time.perf_counter()
+        index.build_ann(dims=args.dims, nlist=args.nlist, train_size=args.train, seed=args.seed)
+        t_build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        index.save(os.path.join(tmp, "saved"))
+        index = QAIndex.load(os.path.join(tmp, "saved"))
+        t_reload = time.perf_counter() - t0
+
+        rng = np.random.default_rng(args.seed + 1)
+        queries = [perturb(questions[i], rng) for i in rng.integers(0, args.n, args.queries)]
+        index.ask(queries[0], exact=True)  # loads qa.json and the posting matrix
+
+        t0 = time.perf_counter()
+        exact = [index.ask(q, args.topk, exact=True) for q in queries]
+        t_exact = (time.perf_counter() - t0) / len(queries)
+
+        print(f"corpus: {args.n:,} questions, {args.topics:,} topics (generated in {t_gen:.1f} s)")
+        print(f"IVF build: {index.ann.nlist} lists × {index.ann.components.shape[0]} dims in {t_build:.1f} s; "
+              f"save + mmap reload {t_reload:.2f} s")
+        print(f"exact: {t_exact * 1000:.2f} ms/query")
+        print(f"{'nprobe':>7} {'ms/query':>9} {'speed-up':>9} {f'recall@{args.topk}':>10} {'recall@1':>9}")
+        for nprobe in args.nprobe:
+            t0 = time.perf_counter()
+            res = [index.ask(q, args.topk, nprobe=nprobe) for q in queries]
+            t_ann = (time.perf_counter() - t0) / len(queries)
+            print(f"{nprobe:>7} {t_ann * 1000:>9.2f} {t_exact / t_ann:>8.1f}× "
+                  f"{recall(res, exact, args.topk):>10.3f} {recall(res, exact, 1):>9.3f}")
+        del index
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
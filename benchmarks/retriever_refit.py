@@ -0,0 +1,76 @@
+"""Consistency check: QAIndex scores after add/remove against a fresh TfidfVectorizer refit.
+
+    python -m benchmarks.retriever_refit                 # data/qa*.csv, 200 random edits each
+    python -m benchmarks.retriever_refit --edits 1000 --seed 3
+
+Every knowledge base is loaded, edited with random remove() and add() calls (re-adding
+removed pairs and adding shuffled-word variants), and after each edit every current question
+and every removed question is asked. The top score (and, for current questions, the score of
+the pair itself) must match cosine similarity under a TfidfVectorizer fitted from scratch on
+the remaining pairs with the same analyzer. Exits with 1 on the first mismatch.
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from retriever import QA_ANALYZERS, QA_FILES, QAIndex
+
+
+def refit_scores(index: QAIndex, queries: list[str]) -> np.ndarray:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vec = TfidfVectorizer(analyzer=index._analyze)
+    rows = vec.fit_transform(index.questions)
+    return (vec.transform(queries) @ rows.T).toarray()
+
+
+def check(index: QAIndex, removed: list[str], atol: float) -> str | None:
+    # current questions must find themselves; removed ones exercise terms left with df = 0
+    queries = list(index.questions) + removed
+    expected = refit_scores(index, queries)
+    for i, (query, answers) in enumerate(zip(queries, index.ask_many(queries, topk=len(index)))):
+        got = {q: s for q, _, s in reversed(answers)}
+        top = answers[0][2] if answers else 0.0
+        own_ok = i >= len(index) or np.isclose(got.get(query, 0.0), expected[i, i], atol=atol)
+        if not (own_ok and np.isclose(top, expected[i].max(), atol=atol)):
+            return f"{query!r}: top score {top:.4f}, refit {expected[i].max():.4f}"
+    return None
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(prog="python -m benchmarks.retriever_refit", description=__doc__.splitlines()[0])
+    p.add_argument("--edits", type=int, default=200, help="random add/remove calls per knowledge base")
+    p.add_argument("--atol", type=float, default=1e-6)
+    p.add_argument("--seed", type=int, default=5)
+    args = p.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    for lang, path in QA_FILES.items():
+        df = pd.read_csv(path)
+        pairs = list(zip(df["question"].astype(str), df["answer"].astype(str)))
+        analyzer, ngram_range = QA_ANALYZERS.get(lang, ("word", (1, 1)))
+        index = QAIndex(pairs, analyzer, ngram_range)
+        removed = []
+        for edit in range(args.edits):
+            if len(index) > 2 and (rng.random() < 0.5 or not removed):
+                i = int(rng.integers(len(index)))
+                removed.append((index.questions[i], index.answers[i]))
+                index.remove(i)
+            elif rng.random() < 0.5:
+                index.add(*removed.pop(int(rng.integers(len(removed)))))
+            else:
+                q, a = pairs[int(rng.integers(len(pairs)))]
+                words = q.split()
+                index.add(" ".join(rng.permutation(words)[:max(1, len(words) - 1)]), a)
+            err = check(index, [q for q, _ in removed], args.atol)
+            if err:
+                print(f"FAIL {lang} after edit {edit + 1} ({len(index)} pairs): {err}")
+                return 1
+        print(f"{lang}: {args.edits} edits, scores match a fresh refit ({len(index)} pairs at the end)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Top-k retrieval benchmark for retriever.QAIndex on a synthetic corpus.
+
+    python -m benchmarks.retriever_topk                  # 1M questions, 500 queries
+    python -m benchmarks.retriever_topk --n 100000 --queries 2000 --topk 5
+
+The corpus is written straight into the on-disk index layout (Zipf-distributed terms) and
+opened with QAIndex.load, so generation does not dominate the run. The baseline is the
+previous path: a dense similarity vector over the whole corpus plus a full argsort.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from scipy import sparse
+
+from retriever import QAIndex
+
+
+def write_corpus(directory: str, rows: np.ndarray, terms: np.ndarray, n: int, vocab: int) -> list[str]:
+    # (row, term) token pairs -> index files in the QAIndex.save layout; returns the questions
+    # duplicate terms inside a question become counts
+    key, counts = np.unique(rows.astype(np.int64) * vocab + terms, return_counts=True)
+    indices = (key % vocab).astype(np.int32)
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(key // vocab, minlength=n))]).astype(np.int64)
+    words = [f"t{i}" for i in range(vocab)]
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, "indptr.npy"), indptr)
+    np.save(os.path.join(directory, "indices.npy"), indices)
+    np.save(os.path.join(directory, "counts.npy"), counts.astype(np.float32))
+    with open(os.path.join(directory, "vocab.json"), "w", encoding="utf-8") as f:
+        json.dump(words, f)
+    questions = [" ".join(words[t] for t in indices[indptr[i]:indptr[i + 1]]) for i in range(n)]
+    with open(os.path.join(directory, "qa.json"), "w", encoding="utf-8") as f:
+        json.dump([questions, [f"answer {i}" for i in range(n)]], f)
+    return questions
+
+
+def make_corpus(directory: str, n: int, vocab: int, seed: int) -> list[str]:
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(6, 15, n)
+    terms = np.minimum(rng.zipf(1.3, lengths.sum()) - 1, vocab - 1)
+    return write_corpus(directory, np.repeat(np.arange(n), lengths), terms, n, vocab)
+
+
+def baseline_ask(rows: sparse.csr_matrix, index: QAIndex, query: str, topk: int) -> np.ndarray:
+    # dense cosine over every row + full argsort; returns the top-k scores
+    sims = rows @ index._query_matrix([query]).toarray().ravel()
+    return sims[sims.argsort()[::-1][:topk]]
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(prog="python -m benchmarks.retriever_topk", description=__doc__.splitlines()[0])
+    p.add_argument("--n", type=int, default=1_000_000, help="questions in the synthetic corpus")
+    p.add_argument("--vocab", type=int, default=50_000)
+    p.add_argument("--queries", type=int, default=500)
+    p.add_argument("--topk", type=int, default=5)
+    p.add_argument("--seed", type=int, default=7)
+    args = p.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        questions = make_corpus(os.path.join(tmp, "index"), args.n, args.vocab, args.seed)
+        t_gen = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        index = QAIndex.load(os.path.join(tmp, "index"))
+        t_load = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        index._postings()
+        t_post = time.perf_counter() - t0
+
+        rng = np.random.default_rng(args.seed + 1)
+        queries = [questions[i] for i in rng.integers(0, args.n, args.queries)]
+        index.ask(queries[0], args.topk)  # loads qa.json
+
+        n_base = min(args.queries, 50)
+        rows = index._postings().T.tocsr()
+        t0 = time.perf_counter()
+        base = [baseline_ask(rows, index, q, args.topk) for q in queries[:n_base]]
+        t_base = (time.perf_counter() - t0) / n_base
+
+        t0 = time.perf_counter()
+        single = [index.ask(q, args.topk) for q in queries]
+        t_single = (time.perf_counter() - t0) / len(queries)
+
+        t0 = time.perf_counter()
+        many = index.ask_many(queries, args.topk)
+        t_many = time.perf_counter() - t0
+
+    # all three paths must agree on the top-k scores
+    agree = np.mean([np.allclose([x[2] for x in s], [x[2] for x in m]) for s, m in zip(single, many)])
+    exact = np.mean([np.allclose([x[2] for x in s], b) for s, b in zip(single, base)])
+    print(f"corpus: {args.n:,} questions, {len(index._vocab):,} terms, {int(index._indptr[-1]):,} non-zeros "
+          f"(generated in {t_gen:.1f} s)")
+    print(f"load (mmap): {t_load * 1000:.1f} ms, posting matrix: {t_post:.2f} s")
+    print(f"baseline dense + argsort: {t_base * 1000:.1f} ms/query ({n_base} queries)")
+    print(f"ask (sparse + argpartition): {t_single * 1000:.2f} ms/query, "
+          f"{t_base / t_single:.0f}× faster")
+    print(f"ask_many: {len(queries)} queries in {t_many:.2f} s ({len(queries) / t_many:,.0f} queries/s); "
+          f"same top-k as ask: {agree:.0%}")
+    print(f"top-k scores equal to the baseline: {exact:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
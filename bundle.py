@@ -0,0 +1,121 @@
+import io
+import os
+import tempfile
+import time
+import zipfile
+from contextlib import contextmanager
+
+# Streaming ZIP bundles: artifacts are written one at a time into an archive on disk, so
+# building one holds a single artifact at a time, not the whole bundle. Serving it does not
+# stream: st.download_button reads the finished file into Streamlit's media store, so the
+# bundle is in memory once per download button while the session shows it.
+# The files live in the temp dir; sweep_temp_files removes the ones of ended sessions.
+
+TEMP_PREFIXES = ("bundle_", "scenarios_")
+TEMP_MAX_AGE_S = 6 * 3600
+
+
+class StageTimings:
+    def __init__(self):
+        self.seconds: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - t0
+
+    def total(self) -> float:
+        return sum(self.seconds.values())
+
+    def rows(self) -> list[dict]:
+        return [{"stage": k, "seconds": round(v, 4)} for k, v in self.seconds.items()]
+
+
+class ZipStreamWriter:
+    def __init__(self, suffix: str = ".zip", timings: StageTimings | None = None):
+        fd, self.path = tempfile.mkstemp(prefix=TEMP_PREFIXES[0], suffix=suffix)
+        os.close(fd)
+        self.timings = timings or StageTimings()
+        self.names: list[str] = []
+        self._zf = zipfile.ZipFile(self.path, "w", zipfile.ZIP_DEFLATED)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        if exc_type is not None:
+            discard(self.path)
+
+    def write_bytes(self, arcname: str, data: bytes) -> None:
+        with self.timings.stage("zip"):
+            self._zf.writestr(arcname, data)
+        self.names.append(arcname)
+
+    def write_chunks(self, arcname: str, chunks) -> None:
+        with self.timings.stage("zip"):
+            with self._zf.open(arcname, "w") as dst:
+                for chunk in chunks:
+                    dst.write(chunk)
+        self.names.append(arcname)
+
+    def write_text(self, arcname: str, writer) -> None:
+        # writer(stream) writes text straight into the compressed entry (e.g. df.to_csv, json.dump)
+        with self.timings.stage("zip"):
+            with self._zf.open(arcname, "w") as raw, io.TextIOWrapper(raw, encoding="utf-8", newline="") as dst:
+                writer(dst)
+        self.names.append(arcname)
+
+    def write_file(self, arcname: str, path: str) -> None:
+        with self.timings.stage("zip"):
+            self._zf.write(path, arcname)
+        self.names.append(arcname)
+
+    def close(self) -> None:
+        if self._zf.fp is not None:
+            self._zf.close()
+
+    def open(self):
+        # BufferedReader, which st.download_button accepts directly (it reads the whole file)
+        self.close()
+        return open(self.path, "rb")
+
+
+def discard(path: str | None) -> None:
+    if not path:
+        return
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def sweep_temp_files(prefixes=TEMP_PREFIXES, max_age_s: float = TEMP_MAX_AGE_S) -> int:
+    # replace_session_file only cleans up after a session that builds again; files of ended
+    # sessions are dropped here once they are older than max_age_s. Returns the number removed
+    cutoff = time.time() - max_age_s
+    removed = 0
+    try:
+        entries = list(os.scandir(tempfile.gettempdir()))
+    except OSError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.name.startswith(tuple(prefixes)) and entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            # already gone, or another process's file we may not touch
+            continue
+    return removed
+
+
+def replace_session_file(state, key: str, path: str) -> None:
+    # Each session keeps only its latest bundle on disk
+    old = state.get(key)
+    if old and old != path:
+        discard(old)
+    state[key] = path
@@ -0,0 +1,103 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from model import ShieldLayer, attenuation_array, pack_scenarios
+from sources import gauss_legendre
+
+# Accumulated dose over an exposure schedule while the source decays:
+#     H = ∫ k·a·exp(-λt) / r(t)² dt,   λ = ln2 / T½   (time in hours, so H is in D·h)
+# A schedule is a list of segments [t0, t0 + Δt] at distance r0 → r1 (linear motion).
+# Stationary segments integrate analytically: k·a/r²·exp(-λt0)·(1 - exp(-λΔt))/λ; moving ones
+# with λ = 0 too: k·a·Δt/(r0·r1); moving ones under decay use vectorized Gauss–Legendre.
+# Everything is flattened to one segment table, so many workers/schedules run as one batch.
+
+
+@dataclass
+class Segment:
+    start_h: float
+    duration_h: float
+    r_start_m: float
+    r_end_m: float | None = None
+
+
+def decay_constant(half_life_h) -> np.ndarray:
+    # λ in 1/h; a missing, zero or infinite half-life means no decay
+    t = np.asarray(np.nan if half_life_h is None else half_life_h, dtype=float)
+    with np.errstate(divide="ignore"):
+        return np.where(np.isfinite(t) & (t > 0), np.log(2.0) / np.where(t > 0, t, 1.0), 0.0)
+
+
+def decay_integral(lam, t0, dt) -> np.ndarray:
+    # ∫_{t0}^{t0+Δt} exp(-λt) dt, with the λ → 0 limit Δt; expm1 keeps small λΔt exact
+    lam, t0, dt = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (lam, t0, dt)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        decayed = np.exp(-lam * t0) * -np.expm1(-lam * dt) / lam
+    return np.where(lam > 0, decayed, dt)
+
+
+def segment_doses(k_att, lam, t0, dt, r0, r1=None, order: int = 24) -> np.ndarray:
+    # Accumulated dose per segment; all arguments broadcast (one entry per segment) and the
+    # result has their broadcast shape, scalars included
+    r1 = r0 if r1 is None else r1
+    args = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (k_att, lam, t0, dt, r0, r1)))
+    shape = args[0].shape
+    # flat copies: the moving-segment branch below indexes by segment number
+    k_att, lam, t0, dt, r0, r1 = (a.ravel() for a in args)
+    r0 = np.maximum(r0, 1e-3)
+    r1 = np.where(np.isnan(r1), r0, np.maximum(r1, 1e-3))
+    dt = np.maximum(dt, 0.0)
+    out = k_att * decay_integral(lam, t0, dt) / (r0 * r0)
+    moving = r1 != r0
+    if moving.any():
+        still = lam[moving] == 0
+        m = np.flatnonzero(moving)
+        # λ = 0: ∫ dt / (r0 + (r1 - r0)·t/Δt)² = Δt / (r0·r1)
+        out[m[still]] = k_att[m[still]] * dt[m[still]] / (r0[m[still]] * r1[m[still]])
+        q = m[~still]
+        if q.size:
+            u, w = gauss_legendre(order, 0.0, 1.0)
+            r = r0[q, None] + (r1[q] - r0[q])[:, None] * u[None, :]
+            f = np.exp(-lam[q, None] * (t0[q, None] + dt[q, None] * u[None, :])) / (r * r)
+            out[q] = k_att[q] * dt[q] * (f @ w)
+    return out.reshape(shape)
+
+
+def cumulative_dose(k_att, lam, segments: list[Segment], t_grid) -> np.ndarray:
+    # H(t) on t_grid for one schedule (for plots): segments are cut at every grid time
+    t_grid = np.asarray(t_grid, dtype=float)
+    total = np.zeros(t_grid.size)
+    for s in segments:
+        r1 = s.r_start_m if s.r_end_m is None else s.r_end_m
+        end = np.clip(t_grid, s.start_h, s.start_h + s.duration_h) - s.start_h
+        frac = np.where(s.duration_h > 0, end / max(s.duration_h, 1e-12), 0.0)
+        total += segment_doses(k_att, lam, s.start_h, end, s.r_start_m, s.r_start_m + (r1 - s.r_start_m) * frac)
+    return total
+
+
+def schedule_dose(k: float, layers: list[ShieldLayer], segments: list[Segment], radiation_type: str = "Гамма",
+                  half_life_h: float | None = None, buildup: bool = False) -> float:
+    att = float(attenuation_array([L.material for L in layers], [L.thickness_cm for L in layers], radiation_type,
+                                  buildup=buildup))
+    lam = decay_constant(half_life_h)
+    seg = np.array([(s.start_h, s.duration_h, s.r_start_m, np.nan if s.r_end_m is None else s.r_end_m)
+                    for s in segments], dtype=float).reshape(-1, 4)
+    return float(segment_doses(k * att, lam, seg[:, 0], seg[:, 1], seg[:, 2], seg[:, 3]).sum())
+
+
+def batch_exposure(scenarios: dict, plan, buildup: bool = False) -> dict:
+    # plan rows: (worker, scenario name, start_h, duration_h, r_start_m, r_end_m or NaN).
+    # Scenarios are in the my_scenarios.json layout, optionally with "half_life_h".
+    # Returns per-row doses and per-worker totals, all computed in one vectorized pass.
+    rows = list(plan)
+    workers = [str(r[0]) for r in rows]
+    names = [str(r[1]) for r in rows]
+    num = np.array([r[2:6] for r in rows], dtype=float).reshape(-1, 4)
+    used, idx = np.unique(np.array(names, dtype=object).astype(str), return_inverse=True)
+    batch = pack_scenarios([(n, scenarios[n]) for n in used])
+    k_att = batch.k * batch.attenuation(buildup)
+    lam = decay_constant([scenarios[n].get("half_life_h") for n in used])
+    doses = segment_doses(k_att[idx], lam[idx], num[:, 0], num[:, 1], num[:, 2], num[:, 3])
+    worker_names, w_idx = np.unique(np.array(workers, dtype=object).astype(str), return_inverse=True)
+    totals = np.bincount(w_idx, weights=doses, minlength=len(worker_names))
+    return {"segment_dose": doses, "workers": list(worker_names), "worker_dose": totals}
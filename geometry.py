@@ -0,0 +1,133 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from model import ShieldLayer, dose_map, mu_values
+
+# Positioned shields as axis-aligned boxes (2D rectangles on a floor plan or 3D boxes), in m.
+# The path length of a source→detector segment through a box comes from the slab method:
+# per axis the segment o + t·d enters/leaves the slab at t = (lo - o)/d and (hi - o)/d, the
+# box is crossed on [max of entries, min of exits] ∩ [0, 1]. Σμ·L then replaces the
+# perpendicular Σμx of model.dose for every pair.
+
+
+@dataclass(frozen=True)
+class Box:
+    material: str
+    lo: tuple[float, ...]
+    hi: tuple[float, ...]
+
+
+def wall(x0: float, y0: float, x1: float, y1: float, thickness_cm: float, material: str) -> Box:
+    # axis-aligned wall along the segment (x0, y0)–(x1, y1), centred on it
+    half = 0.5 * thickness_cm / 100.0
+    if abs(x1 - x0) >= abs(y1 - y0):
+        return Box(material, (min(x0, x1), y0 - half), (max(x0, x1), y0 + half))
+    return Box(material, (x0 - half, min(y0, y1)), (x0 + half, max(y0, y1)))
+
+
+def _safe_inverse(d: np.ndarray) -> np.ndarray:
+    # 1/d with axis-parallel rays (d = 0) turned into a huge finite slope of the right sign,
+    # so (lo - o)/d stays ±large instead of producing 0·inf = NaN
+    tiny = np.where(d == 0, 1e-12, d)
+    return 1.0 / tiny
+
+
+class Scene:
+    def __init__(self, boxes: list[Box], radiation_type: str = "Гамма"):
+        self.boxes = list(boxes)
+        self.radiation_type = radiation_type
+        dim = len(self.boxes[0].lo) if self.boxes else 2
+        self.lo = np.array([b.lo for b in self.boxes], dtype=float).reshape(-1, dim)
+        self.hi = np.array([b.hi for b in self.boxes], dtype=float).reshape(-1, dim)
+        # μ in 1/cm, lengths in m
+        self.mu_m = 100.0 * (mu_values([b.material for b in self.boxes], radiation_type) if self.boxes else np.zeros(0))
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def path_lengths(self, origins, ends) -> np.ndarray:
+        # length (m) of each segment inside each box, shape (..., n_boxes) for origins/ends (..., dim)
+        o = np.asarray(origins, dtype=float)
+        d = np.asarray(ends, dtype=float) - o
+        inv = _safe_inverse(d)
+        seg = np.sqrt((d * d).sum(axis=-1))
+        out = np.empty(o.shape[:-1] + (len(self),))
+        for b in range(len(self)):
+            t_in = np.zeros(o.shape[:-1])
+            t_out = np.ones(o.shape[:-1])
+            for a in range(o.shape[-1]):
+                t1 = (self.lo[b, a] - o[..., a]) * inv[..., a]
+                t2 = (self.hi[b, a] - o[..., a]) * inv[..., a]
+                np.maximum(t_in, np.minimum(t1, t2), out=t_in)
+                np.minimum(t_out, np.maximum(t1, t2), out=t_out)
+            out[..., b] = np.maximum(t_out - t_in, 0.0) * seg
+        return out
+
+    def optical_depth(self, src, det) -> np.ndarray:
+        # Σ μ·L for every detector × source pair, shape (n_det, n_src). Works in place on
+        # preallocated pair-sized buffers (see attenuation.bytes_per_pair) instead of temporaries.
+        src = np.asarray(src, dtype=float)
+        det = np.asarray(det, dtype=float)
+        depth = np.zeros((len(det), len(src)))
+        if not len(self):
+            return depth
+        # 1/d per axis; segments start at the sources, so (lo - o) below is per source
+        inv = np.empty((src.shape[1],) + depth.shape)
+        seg = np.zeros_like(depth)
+        for a in range(src.shape[1]):
+            np.subtract.outer(det[:, a], src[:, a], out=inv[a])
+            seg += np.square(inv[a], out=depth)
+            # axis-parallel rays (d = 0) get a huge finite slope, as in _safe_inverse
+            np.copyto(inv[a], 1e-12, where=inv[a] == 0)
+            np.reciprocal(inv[a], out=inv[a])
+        np.sqrt(seg, out=seg)
+        depth.fill(0.0)
+        t_in = np.empty_like(depth)
+        t_out = np.empty_like(depth)
+        t1 = np.empty_like(depth)
+        t2 = np.empty_like(depth)
+        lo_t = np.empty_like(depth)
+        for b in range(len(self)):
+            t_in.fill(0.0)
+            t_out.fill(1.0)
+            for a in range(src.shape[1]):
+                np.multiply(self.lo[b, a] - src[:, a], inv[a], out=t1)
+                np.multiply(self.hi[b, a] - src[:, a], inv[a], out=t2)
+                np.minimum(t1, t2, out=lo_t)
+                np.maximum(t1, t2, out=t1)
+                np.maximum(t_in, lo_t, out=t_in)
+                np.minimum(t_out, t1, out=t_out)
+            t_out -= t_in
+            np.maximum(t_out, 0.0, out=t_out)
+            t_out *= seg
+            t_out *= self.mu_m[b]
+            depth += t_out
+        return depth
+
+    def attenuation(self, src, det) -> np.ndarray:
+        depth = self.optical_depth(src, det)
+        np.negative(depth, out=depth)
+        return np.exp(depth, out=depth)
+
+    # peak working set of attenuation() per detector × source pair in 2D: result, seg, 1/d per
+    # axis, four slab buffers and the d == 0 mask; model.superpose_dose sizes its blocks with it
+    attenuation.bytes_per_pair = 9 * 8 + 1
+
+    def dose(self, k, src, det) -> np.ndarray:
+        # point sources behind the scene's boxes, pairwise (k per source, no culling)
+        src = np.atleast_2d(np.asarray(src, dtype=float))
+        det = np.atleast_2d(np.asarray(det, dtype=float))
+        r2 = np.maximum(((det[:, None, :] - src[None, :, :]) ** 2).sum(axis=-1), 1e-6)
+        return (self.attenuation(src, det) / r2) @ np.atleast_1d(np.asarray(k, dtype=float))
+
+
+def scene_dose_map(src_xy, k_eff, x, y, scene: Scene, **kwargs) -> np.ndarray:
+    # model.dose_map with the walls of `scene` on every source→detector path
+    return dose_map(src_xy, k_eff, x, y, pair_attenuation=scene.attenuation if len(scene) else None, **kwargs)
+
+
+def slab_layers(scene: Scene, src, det) -> list[ShieldLayer]:
+    # the equivalent perpendicular stack for one ray (path length per box, in cm)
+    lengths = scene.path_lengths(np.asarray(src, dtype=float), np.asarray(det, dtype=float))
+    return [ShieldLayer(b.material, float(100.0 * L)) for b, L in zip(scene.boxes, lengths) if L > 0]
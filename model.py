@@ -19,6 +19,16 @@ MATERIAL_COSTS = {
     "Алюминий": 28.0,
 }
 
+# g/cm³, for areal-weight limits (kg/m² = 10 · Σ ρ·x[cm])
+MATERIAL_DENSITIES = {
+    "Свинец": 11.34,
+    "Сталь": 7.85,
+    "Бетон": 2.30,
+    "Вода": 1.00,
+    "Стекло/акрил": 1.19,
+    "Алюминий": 2.70,
+}
+
 MU_BY_TYPE = {
     "Гамма": {
         "Свинец": 1.20, "Сталь": 0.80, "Бетон": 0.35, "Вода": 0.30, "Стекло/акрил": 0.15, "Алюминий": 0.55
@@ -64,7 +74,8 @@ DANGEROUS_COMBINATIONS = [
 ]
 
 # --- Overrides loader ---
-import json, os
+import hashlib, json, os, threading, time
+from collections import OrderedDict
 
 def _load_mu_override(path: str = "data/mu_override.json"):
     if not os.path.exists(path):
@@ -96,8 +107,147 @@ def _merge_mu(base_table: dict, override: dict | None):
             merged.setdefault(rtype, {})[mat] = float(val)
     return merged
 
-MU_OVERRIDE = _load_mu_override()
-MU_ACTIVE = _merge_mu(MU_BY_TYPE, MU_OVERRIDE)
+# --- Compiled μ table ---
+
+@dataclass(frozen=True)
+class MuTable:
+    # Dense μ indexed by (radiation_type_id, material_id). The last row is the MATERIALS
+    # fallback for unknown radiation types, the last column is 0.0 for unknown materials.
+    rad_codes: dict[str, int]
+    mat_codes: dict[str, int]
+    values: np.ndarray
+
+    @property
+    def unknown_rad(self) -> int:
+        return len(self.rad_codes)
+
+    @property
+    def unknown_mat(self) -> int:
+        return len(self.mat_codes)
+
+    def rad_id(self, radiation_type: str) -> int:
+        return self.rad_codes.get(radiation_type, self.unknown_rad)
+
+    def rad_ids(self, radiation_types) -> np.ndarray:
+        return np.array([self.rad_id(t) for t in radiation_types], dtype=np.intp)
+
+    def mat_ids(self, materials) -> np.ndarray:
+        return np.array([self.mat_codes.get(m, self.unknown_mat) for m in materials], dtype=np.intp)
+
+def compile_mu_table(table: dict) -> MuTable:
+    # Codes are stable: base radiation types and MATERIALS keep their order, extras are appended
+    rad_names = list(RADIATION_TYPES) + [t for t in table if t not in MU_BY_TYPE]
+    mat_names = list(MATERIALS)
+    for mats in table.values():
+        mat_names += [m for m in mats if m not in mat_names]
+    values = np.zeros((len(rad_names) + 1, len(mat_names) + 1), dtype=float)
+    fallback = np.array([MATERIALS.get(m, 0.0) for m in mat_names], dtype=float)
+    for i, rtype in enumerate(rad_names):
+        mats = table.get(rtype, MATERIALS)
+        values[i, :-1] = [mats.get(m, fb) for m, fb in zip(mat_names, fallback)]
+    values[-1, :-1] = fallback
+    values.setflags(write=False)
+    return MuTable(
+        rad_codes={t: i for i, t in enumerate(rad_names)},
+        mat_codes={m: j for j, m in enumerate(mat_names)},
+        values=values,
+    )
+
+# --- Hot-reloadable μ registry ---
+
+MU_OVERRIDE_PATH = "data/mu_override.json"
+
+@dataclass(frozen=True)
+class MuSnapshot:
+    version: int
+    override: dict | None
+    active: dict
+    table: MuTable
+
+class MuRegistry:
+    # Re-merges the override only when its (mtime, size) changes. Readers always get a
+    # complete snapshot: a rebuild swaps one reference, so sessions never see a half-merged table.
+    def __init__(self, path: str = MU_OVERRIDE_PATH, check_interval: float = 0.5):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._checked_at = float("-inf")
+        self._snapshot = MuSnapshot(0, None, MU_BY_TYPE, compile_mu_table(MU_BY_TYPE))
+        self.refresh()
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def refresh(self, force: bool = False) -> MuSnapshot:
+        stamp = self._file_stamp()
+        with self._lock:
+            self._checked_at = time.monotonic()
+            if stamp == self._stamp and not force:
+                return self._snapshot
+            override = _load_mu_override(self.path)
+            active = _merge_mu(MU_BY_TYPE, override)
+            self._snapshot = MuSnapshot(self._snapshot.version + 1, override, active, compile_mu_table(active))
+            self._stamp = stamp
+            return self._snapshot
+
+    def snapshot(self) -> MuSnapshot:
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return self._snapshot
+        return self.refresh()
+
+    @property
+    def version(self) -> int:
+        return self.snapshot().version
+
+    def save(self, override: dict) -> MuSnapshot:
+        # write-to-temp + os.replace so a concurrent reload never reads a partial file
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(override, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+        return self.refresh(force=True)
+
+    def reset(self) -> MuSnapshot:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        return self.refresh(force=True)
+
+MU_REGISTRY = MuRegistry()
+
+def __getattr__(name: str):
+    # MU_OVERRIDE / MU_ACTIVE / MU_TABLE always resolve to the current snapshot
+    if name == "MU_OVERRIDE":
+        return MU_REGISTRY.snapshot().override
+    if name == "MU_ACTIVE":
+        return MU_REGISTRY.snapshot().active
+    if name == "MU_TABLE":
+        return MU_REGISTRY.snapshot().table
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def mu_version() -> int:
+    return MU_REGISTRY.version
+
+def mu_table() -> MuTable:
+    return MU_REGISTRY.snapshot().table
+
+def mu_values(materials, radiation_type) -> np.ndarray:
+    # μ per (radiation type, material); a scalar type gives shape (L,), an array of types (..., L)
+    table = mu_table()
+    mids = table.mat_ids(materials)
+    rt = np.asarray(radiation_type, dtype=object)
+    if rt.ndim == 0:
+        return table.values[table.rad_id(rt.item()), mids]
+    kinds, inverse = np.unique(rt.astype(str), return_inverse=True)
+    rids = table.rad_ids(kinds)[inverse.reshape(rt.shape)]
+    return table.values[rids[..., None], mids]
 
 
 @dataclass
@@ -106,26 +256,467 @@ class ShieldLayer:
     thickness_cm: float
 
 def _mu_for(material: str, radiation_type: str) -> float:
-    table = MU_ACTIVE.get(radiation_type, MATERIALS)
-    return float(table.get(material, MATERIALS.get(material, 0.0)))
-
-def dose(k: float, r_m: float, layers: list[ShieldLayer], radiation_type: str = "Гамма") -> float:
-    if r_m <= 0:
-        r_m = 1e-3
-    mu_sum = 0.0
-    for L in layers:
-        mu_sum += _mu_for(L.material, radiation_type) * max(L.thickness_cm, 0.0)
-    attenuation = np.exp(-mu_sum)
-    return float(k * attenuation / (r_m ** 2))
-
-def dose_curve(k: float, layers: list[ShieldLayer], r_min: float, r_max: float, num: int = 200, radiation_type: str = "Гамма"):
+    table = mu_table()
+    return float(table.values[table.rad_id(radiation_type), table.mat_codes.get(material, table.unknown_mat)])
+
+# --- Buildup factors ---
+
+BUILDUP_PATH = "data/buildup.json"
+BUILDUP_MAX_MUX = 50.0
+BUILDUP_STEP = 0.005
+
+def taylor_buildup(mux, A: float, a1: float, a2: float) -> np.ndarray:
+    mux = np.asarray(mux, dtype=float)
+    return A * np.exp(-a1 * mux) + (1.0 - A) * np.exp(-a2 * mux)
+
+@dataclass(frozen=True)
+class BuildupTable:
+    # ln B per (radiation type, material) on cells of width `step` in μx, each holding the value
+    # at the cell centre, so a lookup is one multiply, one truncation and one gather. The extra
+    # last row and column stay 0 (B = 1) for pairs without coefficients; μx past the table end
+    # uses the last cell.
+    rad_codes: dict[str, int]
+    mat_codes: dict[str, int]
+    log_b: np.ndarray
+    step: float
+
+    def rad_ids(self, radiation_type) -> np.ndarray:
+        rt = np.asarray(radiation_type, dtype=object)
+        ids = [self.rad_codes.get(t, len(self.rad_codes)) for t in rt.ravel()]
+        return np.array(ids, dtype=np.intp).reshape(rt.shape)
+
+    def mat_ids(self, materials) -> np.ndarray:
+        m = np.asarray(materials, dtype=object)
+        ids = [self.mat_codes.get(x, len(self.mat_codes)) for x in m.ravel()]
+        return np.array(ids, dtype=np.intp).reshape(m.shape)
+
+    def offsets(self, rad_ids, mat_ids) -> np.ndarray:
+        # start of each (radiation type, material) row in the flattened table
+        return (np.asarray(rad_ids) * self.log_b.shape[1] + mat_ids) * self.log_b.shape[-1]
+
+    def log_factor(self, rad_ids, mat_ids, mux) -> np.ndarray:
+        return self.log_factor_at(self.offsets(rad_ids, mat_ids), mux)
+
+    def log_factor_at(self, offsets, mux) -> np.ndarray:
+        i = np.asarray(np.asarray(mux, dtype=float) * (1.0 / self.step)).astype(np.intp)
+        np.clip(i, 0, self.log_b.shape[-1] - 1, out=i)
+        flat = self.log_b.reshape(-1)
+        if np.ndim(offsets) == 0:
+            return flat[int(offsets):].take(i)
+        i += offsets
+        return flat.take(i)
+
+    def factor(self, rad_ids, mat_ids, mux) -> np.ndarray:
+        return np.exp(self.log_factor(rad_ids, mat_ids, mux))
+
+    def optical_depth(self, rad_ids, mat_ids, need, iters: int = 48) -> np.ndarray:
+        # smallest μx with μx - ln B(μx) >= need, by vectorized bisection
+        # inf/NaN targets are passed through; they are solved as 0 so the doubling loop ends
+        target = np.maximum(np.asarray(need, dtype=float), 0.0)
+        shape = np.broadcast_shapes(target.shape, np.shape(rad_ids), np.shape(mat_ids))
+        rad_ids, mat_ids, target = (np.broadcast_to(a, shape) for a in (rad_ids, mat_ids, target))
+        finite = np.isfinite(target)
+        need = np.where(finite, target, 0.0)
+        lo = np.zeros(shape)
+        hi = need + 1.0
+        short = hi - self.log_factor(rad_ids, mat_ids, hi) < need
+        while short.any():
+            hi = np.where(short, 2.0 * hi, hi)
+            short = short & (hi - self.log_factor(rad_ids, mat_ids, hi) < need)
+        for _ in range(iters):
+            mid = 0.5 * (lo + hi)
+            ok = mid - self.log_factor(rad_ids, mat_ids, mid) >= need
+            hi = np.where(ok, mid, hi)
+            lo = np.where(ok, lo, mid)
+        return np.where(finite, hi, target)
+
+def _load_buildup(path: str = BUILDUP_PATH) -> dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return {
+            rtype: {mat: (float(c["A"]), float(c["a1"]), float(c["a2"])) for mat, c in mats.items()}
+            for rtype, mats in data.items()
+            if not rtype.startswith("_")
+        }
+    except Exception:
+        return {}
+
+def compile_buildup_table(coeffs: dict, max_mux: float = BUILDUP_MAX_MUX, step: float = BUILDUP_STEP) -> BuildupTable:
+    rad_names = list(RADIATION_TYPES) + [t for t in coeffs if t not in RADIATION_TYPES]
+    mat_names = list(MATERIALS) + sorted({m for mats in coeffs.values() for m in mats} - set(MATERIALS))
+    centres = (np.arange(int(np.ceil(max_mux / step))) + 0.5) * step
+    centres[0] = 0.0  # keeps B = 1 exactly for an unshielded path
+    log_b = np.zeros((len(rad_names) + 1, len(mat_names) + 1, centres.size))
+    for i, rtype in enumerate(rad_names):
+        for j, mat in enumerate(mat_names):
+            c = coeffs.get(rtype, {}).get(mat)
+            if c is not None:
+                log_b[i, j] = np.log(np.maximum(taylor_buildup(centres, *c), 1.0))
+    return BuildupTable(
+        {t: i for i, t in enumerate(rad_names)},
+        {m: j for j, m in enumerate(mat_names)},
+        log_b,
+        step,
+    )
+
+BUILDUP_TABLE = compile_buildup_table(_load_buildup())
+
+def _exit_offsets(materials, th: np.ndarray, radiation_type):
+    # Buildup of a stack is taken for the outermost non-empty layer (the exit material);
+    # returns BUILDUP_TABLE row offsets for it
+    rad = BUILDUP_TABLE.rad_ids(radiation_type)
+    offs = BUILDUP_TABLE.offsets(np.expand_dims(rad, -1), BUILDUP_TABLE.mat_ids(materials))
+    if th.ndim == 1 and offs.ndim == 1:
+        present = np.flatnonzero(th > 0)
+        return int(offs[present[-1] if present.size else 0])
+    return _last_present(offs, th)
+
+def _last_present(offs: np.ndarray, th: np.ndarray) -> np.ndarray:
+    out = np.array(np.broadcast_to(offs[..., 0], np.broadcast_shapes(th.shape[:-1], offs.shape[:-1])))
+    for j in range(1, th.shape[-1]):
+        np.copyto(out, offs[..., j], where=th[..., j] > 0)
+    return out
+
+def attenuation_array(materials, thicknesses, radiation_type="Гамма", buildup: bool = False) -> np.ndarray:
+    # exp(-Σμx) over the last axis of thicknesses; leading axes broadcast with radiation_type.
+    # buildup=True multiplies by B(Σμx) of the exit material from BUILDUP_TABLE.
+    th = np.maximum(np.asarray(thicknesses, dtype=float), 0.0)
+    if th.shape[-1:] != (len(materials),):
+        raise ValueError("thicknesses must end with one axis per material")
+    if not materials:
+        return np.ones(np.broadcast_shapes(th.shape[:-1], np.shape(radiation_type)))
+    mu = mu_values(materials, radiation_type)
+    if mu.ndim > 1:
+        mu_sum = np.einsum("...l,...l->...", mu, th)
+    else:
+        mu_sum = th @ mu
+    if not buildup:
+        return np.exp(-mu_sum)
+    log_b = BUILDUP_TABLE.log_factor_at(_exit_offsets(materials, th, radiation_type), mu_sum)
+    return np.exp(log_b - mu_sum)
+
+def dose_array(k, r_m, layers: list[ShieldLayer] = (), radiation_type="Гамма", thicknesses=None,
+               buildup: bool = False) -> np.ndarray:
+    # Batched D(r): k, r_m and the configuration axes broadcast together.
+    # thicknesses (shape (..., len(layers))) overrides the layer thicknesses to sweep stacks at once.
+    materials = [L.material for L in layers]
+    if thicknesses is None:
+        thicknesses = [L.thickness_cm for L in layers]
+    att = attenuation_array(materials, thicknesses, radiation_type, buildup=buildup)
+    r = np.asarray(r_m, dtype=float)
+    r = np.where(r <= 0, 1e-3, r)
+    return np.asarray(k, dtype=float) * att / (r ** 2)
+
+def dose(k: float, r_m: float, layers: list[ShieldLayer], radiation_type: str = "Гамма", buildup: bool = False) -> float:
+    return float(dose_array(k, r_m, layers, radiation_type=radiation_type, buildup=buildup))
+
+def dose_curve(k: float, layers: list[ShieldLayer], r_min: float, r_max: float, num: int = 200,
+               radiation_type: str = "Гамма", buildup: bool = False):
     r = np.linspace(max(r_min, 1e-3), max(r_max, 1e-3), num=num)
-    d = np.array([dose(k, ri, layers, radiation_type=radiation_type) for ri in r], dtype=float)
+    d = dose_array(k, r, layers, radiation_type=radiation_type, buildup=buildup)
     return r, d
 
+# --- Dose-curve cache ---
+
+def scenario_key(k: float, layers: list[ShieldLayer], radiation_type: str, r_min: float, r_max: float, num: int,
+                 buildup: bool = False) -> str:
+    # Σμx does not depend on layer order, and empty layers contribute nothing;
+    # with buildup the exit material matters, so the order is kept
+    stack = [(L.material, float(L.thickness_cm)) for L in layers if L.thickness_cm > 0]
+    if not buildup:
+        stack.sort()
+    canon = [float(k), stack, radiation_type, float(r_min), float(r_max), int(num), mu_version()]
+    if buildup:
+        canon.append("buildup")
+    return hashlib.sha1(json.dumps(canon, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+class CurveCache:
+    # Process-wide LRU shared by all sessions, bounded by entry count and array bytes
+    def __init__(self, max_entries: int = 512, max_bytes: int = 64 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: OrderedDict[str, tuple[np.ndarray, np.ndarray]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: tuple[np.ndarray, np.ndarray]) -> None:
+        for arr in value:
+            arr.setflags(write=False)
+        with self._lock:
+            if key in self._data:
+                return
+            self._data[key] = value
+            self._bytes += sum(arr.nbytes for arr in value)
+            while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                _, old = self._data.popitem(last=False)
+                self._bytes -= sum(arr.nbytes for arr in old)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "evictions": self.evictions,
+            }
+
+CURVE_CACHE = CurveCache()
+
+def cached_dose_curve(k: float, layers: list[ShieldLayer], r_min: float, r_max: float, num: int = 200,
+                      radiation_type: str = "Гамма", buildup: bool = False):
+    # Same result as dose_curve; the returned arrays are read-only views shared across sessions
+    key = scenario_key(k, layers, radiation_type, r_min, r_max, num, buildup)
+    curve = CURVE_CACHE.get(key)
+    if curve is None:
+        curve = dose_curve(k, layers, r_min, r_max, num=num, radiation_type=radiation_type, buildup=buildup)
+        CURVE_CACHE.put(key, curve)
+    return curve
+
+# --- Batch scenario evaluation ---
+
+@dataclass
+class ScenarioBatch:
+    names: list[str]
+    k: np.ndarray            # (N,)
+    D_safe: np.ndarray       # (N,)
+    rad_idx: np.ndarray      # (N,) index into rad_types
+    mat_idx: np.ndarray      # (N, L) index into materials, -1 = padding
+    thickness: np.ndarray    # (N, L) cm, 0 for padding
+    rad_types: list[str]
+    materials: list[str]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def attenuation(self, buildup: bool = False) -> np.ndarray:
+        if self.mat_idx.shape[1] == 0:
+            return np.ones(len(self))
+        table = mu_table()
+        rids = table.rad_ids(self.rad_types)[self.rad_idx]
+        mids = table.mat_ids(self.materials)[np.maximum(self.mat_idx, 0)]
+        mu = table.values[rids[:, None], mids]
+        th = np.where(self.mat_idx >= 0, self.thickness, 0.0)
+        mu_sum = np.einsum("nl,nl->n", mu, th)
+        if not buildup:
+            return np.exp(-mu_sum)
+        offs = BUILDUP_TABLE.offsets(
+            BUILDUP_TABLE.rad_ids(self.rad_types)[self.rad_idx][:, None],
+            BUILDUP_TABLE.mat_ids(self.materials)[np.maximum(self.mat_idx, 0)],
+        )
+        return np.exp(BUILDUP_TABLE.log_factor_at(_last_present(offs, th), mu_sum) - mu_sum)
+
+def pack_scenarios(scenarios) -> ScenarioBatch:
+    # scenarios in the my_scenarios.json layout (name -> {"k", "D_safe", "layers", "radiation_type", ...})
+    # or a list of (name, scenario) pairs when names may repeat
+    items = list(scenarios.items()) if isinstance(scenarios, dict) else list(scenarios)
+    names = [name for name, _ in items]
+    n = len(names)
+    n_layers = max((len(sc.get("layers", [])) for _, sc in items), default=0)
+    rad_codes: dict[str, int] = {}
+    mat_codes: dict[str, int] = {}
+    k = np.empty(n, dtype=float)
+    D_safe = np.empty(n, dtype=float)
+    rad_idx = np.empty(n, dtype=np.int32)
+    mat_idx = np.full((n, n_layers), -1, dtype=np.int32)
+    thickness = np.zeros((n, n_layers), dtype=float)
+    for i, (_, sc) in enumerate(items):
+        k[i] = float(sc.get("k", 0.0))
+        D_safe[i] = float(sc.get("D_safe", np.nan))
+        rad_idx[i] = rad_codes.setdefault(sc.get("radiation_type", "Гамма"), len(rad_codes))
+        for j, L in enumerate(sc.get("layers", [])):
+            mat_idx[i, j] = mat_codes.setdefault(L["material"], len(mat_codes))
+            thickness[i, j] = max(float(L["thickness_cm"]), 0.0)
+    return ScenarioBatch(names, k, D_safe, rad_idx, mat_idx, thickness, list(rad_codes), list(mat_codes))
+
+def radius_grid(r_min: float, r_max: float, num: int = 200) -> np.ndarray:
+    # same grid as dose_curve
+    return np.linspace(max(r_min, 1e-3), max(r_max, 1e-3), num=num)
+
+def iter_dose_blocks(batch: ScenarioBatch, r, max_bytes: int = 64 * 2**20, dtype=np.float64, buildup: bool = False):
+    # Yields (row slice, dose block) with each block bounded by max_bytes
+    r = np.asarray(r, dtype=float)
+    r = np.where(r <= 0, 1e-3, r)
+    inv_r2 = 1.0 / (r ** 2)
+    row_bytes = max(r.size * np.dtype(dtype).itemsize, 1)
+    rows = max(int(max_bytes // row_bytes), 1)
+    scale = batch.k * batch.attenuation(buildup)
+    for start in range(0, len(batch), rows):
+        sl = slice(start, min(start + rows, len(batch)))
+        yield sl, np.multiply.outer(scale[sl], inv_r2).astype(dtype, copy=False)
+
+def dose_matrix(batch: ScenarioBatch, r, out: np.ndarray | None = None, max_bytes: int = 64 * 2**20,
+                buildup: bool = False) -> np.ndarray:
+    # N×M dose matrix; pass out (e.g. an np.memmap) to keep peak memory at one block
+    r = np.asarray(r, dtype=float)
+    if out is None:
+        out = np.empty((len(batch), r.size), dtype=float)
+    for sl, block in iter_dose_blocks(batch, r, max_bytes=max_bytes, dtype=out.dtype, buildup=buildup):
+        out[sl] = block
+    return out
+
 def classify_zone(D: float, D_safe: float) -> str:
     if D <= D_safe:
         return "green"
     if D <= 3.0 * D_safe:
         return "yellow"
     return "red"
+
+def classify_zones(D, D_safe) -> np.ndarray:
+    # vectorized classify_zone
+    D = np.asarray(D, dtype=float)
+    D_safe = np.asarray(D_safe, dtype=float)
+    return np.where(D <= D_safe, "green", np.where(D <= 3.0 * D_safe, "yellow", "red"))
+
+def recommended_thickness(k, r_m, D_safe, radiation_type="Гамма", materials=None, buildup: bool = False) -> np.ndarray:
+    # Single-material thickness that brings D(r) down to D_safe, shape (..., len(materials)).
+    # 0 where no shield is needed, NaN where μ <= 0 or k <= 0, inf where D_safe <= 0 or r <= 0
+    # (no finite shield is enough). With buildup, μx - ln B(μx) = need is solved per material by
+    # bisection on the interpolation table.
+    materials = list(MATERIALS) if materials is None else list(materials)
+    k, r, D_safe = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (k, r_m, D_safe)))
+    mu = mu_values(materials, radiation_type)
+    reachable = (k > 0) & (D_safe > 0) & (r > 0)
+    target = np.where(reachable, D_safe * r ** 2 / np.where(reachable, k, 1.0), 1.0)
+    need = np.where(reachable, np.maximum(-np.log(target), 0.0), np.where(k > 0, np.inf, np.nan))[..., None]
+    if buildup:
+        rad = BUILDUP_TABLE.rad_ids(radiation_type)
+        depth = BUILDUP_TABLE.optical_depth(rad, BUILDUP_TABLE.mat_ids(materials), need)
+        need = np.where(need > 0, depth, need)
+    return np.where(mu > 0, need / np.where(mu > 0, mu, 1.0), np.nan)
+
+# --- Inverse solver: zone boundaries in r ---
+
+def zone_radii(k, attenuation, D_safe) -> tuple[np.ndarray, np.ndarray]:
+    # D(r) = k·a/r² crosses D_safe at r_safe and 3·D_safe at r_red:
+    # r >= r_safe is green, r_red <= r < r_safe yellow, r < r_red red (as classify_zone)
+    ka = np.asarray(k, dtype=float) * np.asarray(attenuation, dtype=float)
+    D_safe = np.asarray(D_safe, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r_safe = np.sqrt(np.maximum(ka, 0.0) / D_safe)
+        r_red = np.sqrt(np.maximum(ka, 0.0) / (3.0 * D_safe))
+    return r_safe, r_red
+
+def safe_radius(k: float, layers: list[ShieldLayer], D_safe: float, radiation_type: str = "Гамма",
+                buildup: bool = False) -> float:
+    att = attenuation_array([L.material for L in layers], [L.thickness_cm for L in layers], radiation_type, buildup=buildup)
+    return float(zone_radii(k, att, D_safe)[0])
+
+def zone_radius_grid(k, thickness, materials=None, D_safe=0.2, radiation_type="Гамма",
+                     buildup: bool = False) -> tuple[np.ndarray, np.ndarray]:
+    # r_safe / r_red over k × thickness × single-material shields, shape (len(k), len(thickness), len(materials))
+    materials = list(MATERIALS) if materials is None else list(materials)
+    k = np.asarray(k, dtype=float).reshape(-1, 1, 1)
+    th = np.maximum(np.asarray(thickness, dtype=float), 0.0).reshape(1, -1, 1)
+    mu = mu_values(materials, radiation_type).reshape(1, 1, -1)
+    mux = mu * th
+    if buildup:
+        offs = BUILDUP_TABLE.offsets(BUILDUP_TABLE.rad_ids(radiation_type), BUILDUP_TABLE.mat_ids(materials))
+        mux = mux - BUILDUP_TABLE.log_factor_at(offs.reshape(1, 1, -1), mux)
+    return zone_radii(k, np.exp(-mux), D_safe)
+
+# --- Multi-source superposition over a floor plan ---
+
+def source_strengths(k, layers=None, radiation_type="Гамма", buildup: bool = False) -> np.ndarray:
+    # Effective strength k·attenuation per source; layers is one ShieldLayer list per source
+    # (the shield assigned to that source), radiation_type a scalar or one type per source
+    k = np.atleast_1d(np.asarray(k, dtype=float))
+    if not layers:
+        return k.copy()
+    rt = np.broadcast_to(np.asarray(radiation_type, dtype=object), k.shape)
+    items = [
+        (str(i), {"k": 1.0, "radiation_type": t, "layers": [{"material": L.material, "thickness_cm": L.thickness_cm} for L in ls]})
+        for i, (t, ls) in enumerate(zip(rt, layers))
+    ]
+    return k * pack_scenarios(items).attenuation(buildup)
+
+def _superpose_block(src: np.ndarray, k_eff: np.ndarray, det: np.ndarray, cutoff: float | None,
+                     pair_attenuation=None) -> np.ndarray:
+    if cutoff:
+        # bounding-box culling: drop sources whose largest possible contribution anywhere in the
+        # block is below cutoff / n_sources, so the total dropped dose stays below cutoff
+        gap = np.maximum(np.maximum(det.min(axis=0) - src, src - det.max(axis=0)), 0.0)
+        d2 = np.maximum((gap * gap).sum(axis=1), 1e-6)
+        keep = k_eff / d2 >= cutoff / max(len(k_eff), 1)
+        src, k_eff = src[keep], k_eff[keep]
+        if not len(k_eff):
+            return np.zeros(len(det))
+    r2 = np.subtract.outer(det[:, 0], src[:, 0])
+    r2 *= r2
+    dy = np.subtract.outer(det[:, 1], src[:, 1])
+    dy *= dy
+    r2 += dy
+    np.maximum(r2, 1e-6, out=r2)  # same 1e-3 m floor as dose_array
+    np.reciprocal(r2, out=r2)
+    if pair_attenuation is not None:
+        r2 *= pair_attenuation(src, det)
+    return r2 @ k_eff
+
+def superpose_dose(src_xy, k_eff, det_xy, cutoff: float | None = None, block: int = 8192,
+                   workers: int | None = None, out: np.ndarray | None = None, pair_attenuation=None,
+                   max_bytes: int = 256 * 2**20) -> np.ndarray:
+    # D(p) = Σ_s k_eff_s / |p - s|² for detector points det_xy (N, 2) and sources src_xy (S, 2), in m.
+    # Detectors are processed in blocks on a thread pool (NumPy releases the GIL in the kernels).
+    # pair_attenuation(src (S, 2), det (n, 2)) -> (n, S) multiplies in path-dependent attenuation,
+    # e.g. geometry.Scene.attenuation for positioned walls; its `bytes_per_pair` attribute (if
+    # any) is the hook's working set per pair. Blocks are sized so all workers together stay
+    # within max_bytes of pair-sized temporaries.
+    from concurrent.futures import ThreadPoolExecutor
+    src = np.asarray(src_xy, dtype=float).reshape(-1, 2)
+    k_eff = np.asarray(k_eff, dtype=float).reshape(-1)
+    det = np.asarray(det_xy, dtype=float).reshape(-1, 2)
+    if out is None:
+        out = np.empty(len(det))
+    if not len(k_eff):
+        out[:] = 0.0
+        return out
+    workers = workers or os.cpu_count() or 1
+    # r² and dy in _superpose_block, plus whatever the attenuation hook allocates
+    pair_bytes = 16 + (getattr(pair_attenuation, "bytes_per_pair", 64) if pair_attenuation is not None else 0)
+    block = max(min(block, max_bytes // (workers * pair_bytes * max(len(k_eff), 1))), 256)
+    starts = range(0, len(det), block)
+
+    def run(start):
+        sl = slice(start, min(start + block, len(det)))
+        out[sl] = _superpose_block(src, k_eff, det[sl], cutoff, pair_attenuation)
+
+    if workers > 1 and len(starts) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(run, starts))
+    else:
+        for start in starts:
+            run(start)
+    return out
+
+def dose_map(src_xy, k_eff, x, y, **kwargs) -> np.ndarray:
+    # superpose_dose on the grid x × y, returned with shape (len(y), len(x))
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    det = np.empty((y.size, x.size, 2))
+    det[..., 0] = x[None, :]
+    det[..., 1] = y[:, None]
+    return superpose_dose(src_xy, k_eff, det.reshape(-1, 2), **kwargs).reshape(y.size, x.size)
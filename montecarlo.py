@@ -0,0 +1,195 @@
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+
+import numpy as np
+
+from model import ShieldLayer, mu_values
+
+# Monte Carlo transport of a normally incident pencil beam through the ShieldLayer stack
+# (infinite slabs along z). μ from the active table is the total interaction coefficient;
+# SCATTER_ALBEDO is the illustrative fraction of interactions that scatter instead of absorb.
+# Histories are batched: each batch is a set of NumPy state arrays (z, cos θ, weight) advanced
+# together with delta tracking, implicit capture and Russian roulette. The transmitted weight
+# per history gives T ≈ B·exp(-Σμx), so D(r) = k·T/r² replaces the narrow-beam exp(-Σμx).
+
+SCATTER_ALBEDO = {
+    "Свинец": 0.25,
+    "Сталь": 0.55,
+    "Бетон": 0.80,
+    "Вода": 0.90,
+    "Стекло/акрил": 0.85,
+    "Алюминий": 0.75,
+}
+ANISOTROPY = 0.6  # Henyey–Greenstein g: photons scatter mostly forward
+# without variance reduction deep penetration is rarely scored: above this relative error
+# (or with nothing transmitted) the tally does not resolve the transmission
+MC_MAX_REL_ERR = 0.1
+
+# Persistent pool shared by all simulate() calls of the process (the Streamlit server runs
+# them from its threads), started with spawn like render.py: forking a threaded server is unsafe.
+_POOL: ProcessPoolExecutor | None = None
+_POOL_WORKERS = 0
+_POOL_LOCK = threading.Lock()
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_WORKERS < workers:
+            if _POOL is not None:
+                _POOL.shutdown(wait=False)
+            _POOL = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _POOL_WORKERS = workers
+        return _POOL
+
+
+def shutdown_pool() -> None:
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL, _POOL_WORKERS = None, 0
+
+
+atexit.register(shutdown_pool)
+
+
+@dataclass
+class MCResult:
+    transmission: float
+    std_err: float
+    narrow_beam: float
+    histories: int
+    seconds: float
+
+    @property
+    def buildup(self) -> float:
+        return self.transmission / self.narrow_beam if self.narrow_beam > 0 else float("nan")
+
+    @property
+    def rel_err(self) -> float:
+        return self.std_err / self.transmission if self.transmission > 0 else float("inf")
+
+    @property
+    def resolved(self) -> bool:
+        return self.transmission > 0 and self.rel_err <= MC_MAX_REL_ERR
+
+    @property
+    def histories_per_s(self) -> float:
+        return self.histories / self.seconds if self.seconds > 0 else float("inf")
+
+    def dose(self, k, r_m):
+        return k * self.transmission / np.maximum(np.asarray(r_m, dtype=float), 1e-3) ** 2
+
+    def dose_err(self, k, r_m):
+        return k * self.std_err / np.maximum(np.asarray(r_m, dtype=float), 1e-3) ** 2
+
+
+def _sample_hg(cos_in: np.ndarray, g: float, rng: np.random.Generator) -> np.ndarray:
+    # new direction cosine to the slab normal after a Henyey–Greenstein deflection
+    n = cos_in.size
+    xi = rng.random(n)
+    if abs(g) < 1e-6:
+        cos_t = 2.0 * xi - 1.0
+    else:
+        s = (1.0 - g * g) / (1.0 - g + 2.0 * g * xi)
+        cos_t = (1.0 + g * g - s * s) / (2.0 * g)
+    cos_t = np.clip(cos_t, -1.0, 1.0)
+    phi = 2.0 * np.pi * rng.random(n)
+    sin_in = np.sqrt(np.maximum(1.0 - cos_in ** 2, 0.0))
+    sin_t = np.sqrt(np.maximum(1.0 - cos_t ** 2, 0.0))
+    return np.clip(cos_in * cos_t + sin_in * sin_t * np.cos(phi), -1.0, 1.0)
+
+
+def transport_batch(bounds: np.ndarray, mu: np.ndarray, albedo: np.ndarray, n: int, seed,
+                    g: float = ANISOTROPY, w_min: float = 1e-3, w_survive: float = 1e-2,
+                    max_collisions: int = 1000) -> tuple[float, float]:
+    # One independent batch; returns (Σ score, Σ score²) over its n histories.
+    # bounds are the layer edges in cm (len(mu) + 1 values starting at 0).
+    rng = np.random.default_rng(seed)
+    mu_max = float(mu.max()) if mu.size else 0.0
+    total = float(bounds[-1]) if bounds.size else 0.0
+    if n == 0:
+        return 0.0, 0.0
+    if mu_max <= 0.0 or total <= 0.0:
+        return float(n), float(n)
+
+    z = np.zeros(n)
+    cos = np.ones(n)
+    w = np.ones(n)
+    score = np.zeros(n)
+    alive = np.arange(n)
+    for _ in range(max_collisions):
+        if alive.size == 0:
+            break
+        # delta tracking: flight to a tentative collision against the majorant μ_max
+        z_a = z[alive] + cos[alive] * (-np.log1p(-rng.random(alive.size)) / mu_max)
+        out_far = z_a >= total
+        out_near = z_a <= 0.0
+        score[alive[out_far]] += w[alive[out_far]]
+        inside = ~(out_far | out_near)
+        alive = alive[inside]
+        z[alive] = z_a[inside]
+        if alive.size == 0:
+            break
+        layer = np.clip(np.searchsorted(bounds, z[alive], side="right") - 1, 0, mu.size - 1)
+        real = rng.random(alive.size) * mu_max < mu[layer]
+        hit = alive[real]
+        # implicit capture: survive every real collision with the scattering share of the weight
+        w[hit] *= albedo[layer[real]]
+        cos[hit] = _sample_hg(cos[hit], g, rng)
+        # Russian roulette keeps the mean weight while dropping negligible histories
+        low = hit[w[hit] < w_min]
+        survive = rng.random(low.size) < w[low] / w_survive
+        w[low] = np.where(survive, w_survive, 0.0)
+        alive = alive[w[alive] > 0.0]
+    return float(score.sum()), float((score ** 2).sum())
+
+
+def _batch_job(args):
+    return transport_batch(*args)
+
+
+def simulate(layers: list[ShieldLayer], radiation_type: str = "Гамма", histories: int = 100_000,
+             batch_size: int = 20_000, seed: int = 12345, workers: int | None = None,
+             g: float = ANISOTROPY, albedo: dict | None = None) -> MCResult:
+    # Batches get independent streams from SeedSequence.spawn, so the result for a given seed
+    # does not depend on how batches are distributed over worker processes.
+    layers = [L for L in layers if L.thickness_cm > 0]
+    albedo = {**SCATTER_ALBEDO, **(albedo or {})}
+    mu = mu_values([L.material for L in layers], radiation_type) if layers else np.zeros(0)
+    a = np.array([albedo.get(L.material, 0.5) for L in layers], dtype=float)
+    bounds = np.concatenate([[0.0], np.cumsum([L.thickness_cm for L in layers])])
+    narrow = float(np.exp(-(mu * np.diff(bounds)).sum()))
+
+    sizes = [batch_size] * (histories // batch_size)
+    if histories % batch_size:
+        sizes.append(histories % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(bounds, mu, a, n, s, g) for n, s in zip(sizes, seeds)]
+
+    workers = workers if workers is not None else max(1, (os.cpu_count() or 1) - 1)
+    t0 = time.perf_counter()
+    if workers > 1 and len(jobs) > 1:
+        try:
+            parts = list(get_pool(workers).map(_batch_job, jobs))
+        except BrokenProcessPool:
+            # a crashed worker poisons the pool; start a fresh one next time
+            shutdown_pool()
+            raise
+    else:
+        parts = [_batch_job(j) for j in jobs]
+    seconds = time.perf_counter() - t0
+
+    s1 = sum(p[0] for p in parts)
+    s2 = sum(p[1] for p in parts)
+    mean = s1 / histories if histories else 0.0
+    var = max(s2 / histories - mean * mean, 0.0) if histories else 0.0
+    std_err = float(np.sqrt(var / max(histories - 1, 1)))
+    return MCResult(mean, std_err, narrow, histories, seconds)
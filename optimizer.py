@@ -0,0 +1,246 @@
+from dataclasses import dataclass
+from itertools import combinations
+
+import numpy as np
+
+from model import MATERIAL_COSTS, MATERIAL_DENSITIES, MATERIALS, ShieldLayer, dose, mu_values
+
+# Cheapest shield stack meeting D(r) <= D_safe.
+# In log space the target is linear: Σ μ_i·x_i >= L with L = ln(k / (D_safe·r²)), so with
+# per-cm costs c_i the design problem is the LP
+#     min c·x   s.t.   μ·x >= L,   Σx <= T_max,   ρ·x <= W_max,   x >= 0.
+# An optimal vertex has at most one non-zero thickness per tight constraint (<= 3 layers),
+# so it is found by enumerating supports and solving the tiny tight systems for all
+# queries at once.
+
+BUILDUP_ROUNDS = 50
+BUILDUP_RTOL = 1e-3
+
+
+@dataclass
+class StackDesign:
+    layers: list[ShieldLayer]
+    cost: float
+    thickness_cm: float
+    weight_kg_m2: float
+    feasible: bool
+
+
+def required_log_attenuation(k, r_m, D_safe) -> np.ndarray:
+    k, r, D_safe = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (k, r_m, D_safe)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.maximum(np.log(k / (D_safe * np.maximum(r, 1e-3) ** 2)), 0.0)
+
+
+def _query_arrays(k, r_m, D_safe, radiation_type, max_thickness, max_weight):
+    L = np.atleast_1d(required_log_attenuation(k, r_m, D_safe))
+    rt = np.asarray(radiation_type, dtype=object)
+    shape = np.broadcast_shapes(L.shape, rt.shape, np.shape(max_thickness), np.shape(max_weight))
+    L = np.broadcast_to(L, shape).ravel()
+    rt = np.broadcast_to(rt, shape).ravel()
+    T = np.broadcast_to(np.asarray(np.inf if max_thickness is None else max_thickness, dtype=float), shape).ravel()
+    W = np.broadcast_to(np.asarray(np.inf if max_weight is None else max_weight, dtype=float), shape).ravel()
+    return shape, L, rt, T, W / 10.0  # kg/m² -> g/cm²
+
+
+def _cramer(A: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # batched solve that yields NaN instead of raising on singular systems
+    det = np.linalg.det(A)
+    out = np.empty(b.shape)
+    for j in range(A.shape[-1]):
+        Aj = A.copy()
+        Aj[..., :, j] = b
+        out[..., j] = np.linalg.det(Aj)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out /= det[..., None]
+    out[np.abs(det) < 1e-12] = np.nan
+    return out
+
+
+def optimize_stacks(k, r_m, D_safe, radiation_type="Гамма", max_layers: int = 3, max_thickness=None,
+                    max_weight=None, costs: dict | None = None, materials=None) -> dict:
+    # Vectorized over queries: k, r_m, D_safe, radiation_type and the limits broadcast together.
+    # Returns arrays with the broadcast shape (+ a materials axis for "thickness").
+    materials = list(MATERIALS) if materials is None else list(materials)
+    costs = {**MATERIAL_COSTS, **(costs or {})}
+    c = np.array([costs.get(m, 10.0) for m in materials], dtype=float)
+    rho = np.array([MATERIAL_DENSITIES.get(m, 1.0) for m in materials], dtype=float)
+    shape, L, rt, T, W = _query_arrays(k, r_m, D_safe, radiation_type, max_thickness, max_weight)
+    Q, M = L.size, len(materials)
+    mu = mu_values(materials, rt) if Q else np.zeros((0, M))
+    mu = np.broadcast_to(mu, (Q, M))
+
+    best_cost = np.where(L <= 0, 0.0, np.inf)
+    best_x = np.zeros((Q, M))
+    rows_T = np.broadcast_to(np.ones(M), (Q, M))
+    rows_W = np.broadcast_to(rho, (Q, M))
+    limits = [("T", rows_T, T), ("W", rows_W, W)]
+    for s in range(1, min(max_layers, 3, M) + 1):
+        for support in combinations(range(M), s):
+            idx = list(support)
+            for extra in combinations(limits, s - 1):
+                rows = [mu[:, idx]] + [r[:, idx] for _, r, _ in extra]
+                rhs = [L] + [lim for _, _, lim in extra]
+                A = np.stack(rows, axis=1)
+                b = np.stack(rhs, axis=1)
+                with np.errstate(invalid="ignore"):
+                    x = _cramer(A, b) if s > 1 else b / A[:, :, 0]
+                x_full = np.zeros((Q, M))
+                x_full[:, idx] = x
+                with np.errstate(invalid="ignore"):
+                    ok = (
+                        np.all(x >= -1e-9, axis=1)
+                        & np.isfinite(x).all(axis=1)
+                        & (np.einsum("qm,qm->q", mu, x_full) >= L * (1 - 1e-9))
+                        & (x_full.sum(axis=1) <= T * (1 + 1e-9) + 1e-12)
+                        & (x_full @ rho <= W * (1 + 1e-9) + 1e-12)
+                    )
+                    cost = np.where(ok, x_full @ c, np.inf)
+                better = cost < best_cost
+                best_cost = np.where(better, cost, best_cost)
+                best_x[better] = np.maximum(x_full[better], 0.0)
+    return {
+        "materials": materials,
+        "thickness": best_x.reshape(shape + (M,)),
+        "cost": best_cost.reshape(shape),
+        "total_thickness": best_x.sum(axis=1).reshape(shape),
+        "weight_kg_m2": (10.0 * best_x @ rho).reshape(shape),
+        "feasible": np.isfinite(best_cost).reshape(shape),
+    }
+
+
+def grid_search_stack(k: float, r_m: float, D_safe: float, radiation_type: str = "Гамма", max_layers: int = 3,
+                      step: float = 0.5, max_layer_cm: float = 50.0, max_thickness=None, max_weight=None,
+                      costs: dict | None = None, materials=None, chunk: int = 2_000_000) -> dict:
+    # Fallback for discrete plate thicknesses (multiples of step): brute-force over every
+    # material subset and thickness grid, evaluated in vectorized chunks.
+    materials = list(MATERIALS) if materials is None else list(materials)
+    costs = {**MATERIAL_COSTS, **(costs or {})}
+    c = np.array([costs.get(m, 10.0) for m in materials], dtype=float)
+    rho = np.array([MATERIAL_DENSITIES.get(m, 1.0) for m in materials], dtype=float)
+    mu = mu_values(materials, radiation_type)
+    L = float(required_log_attenuation(k, r_m, D_safe))
+    T = np.inf if max_thickness is None else float(max_thickness)
+    W = np.inf if max_weight is None else float(max_weight) / 10.0
+    steps = np.arange(1, int(np.floor(max_layer_cm / step)) + 1) * step
+    best = {"cost": 0.0 if L <= 0 else np.inf, "thickness": np.zeros(len(materials))}
+    if L <= 0:
+        return {"materials": materials, **best, "feasible": True}
+    for s in range(1, min(max_layers, len(materials)) + 1):
+        for support in combinations(range(len(materials)), s):
+            idx = list(support)
+            n = steps.size ** s
+            for start in range(0, n, chunk):
+                flat = np.arange(start, min(start + chunk, n))
+                x = steps[np.stack(np.unravel_index(flat, (steps.size,) * s), axis=1)]
+                ok = (x @ mu[idx] >= L) & (x.sum(axis=1) <= T) & (x @ rho[idx] <= W)
+                if not ok.any():
+                    continue
+                cost = np.where(ok, x @ c[idx], np.inf)
+                i = int(np.argmin(cost))
+                if cost[i] < best["cost"]:
+                    th = np.zeros(len(materials))
+                    th[idx] = x[i]
+                    best = {"cost": float(cost[i]), "thickness": th}
+    return {"materials": materials, **best, "feasible": bool(np.isfinite(best["cost"]))}
+
+
+def _stack_design(k: float, r_m: float, D_safe: float, radiation_type: str, max_layers: int, max_thickness,
+                  max_weight, costs: dict | None, step: float | None) -> StackDesign:
+    # step switches to the discrete grid search
+    if step:
+        res = grid_search_stack(k, r_m, D_safe, radiation_type, max_layers=max_layers, step=step,
+                                max_thickness=max_thickness, max_weight=max_weight, costs=costs)
+        th, cost, feasible = res["thickness"], res["cost"], res["feasible"]
+    else:
+        res = optimize_stacks(k, r_m, D_safe, radiation_type, max_layers=max_layers,
+                              max_thickness=max_thickness, max_weight=max_weight, costs=costs)
+        th, cost, feasible = res["thickness"][0], float(res["cost"][0]), bool(res["feasible"][0])
+    materials = res["materials"]
+    layers = [ShieldLayer(m, float(x)) for m, x in zip(materials, th) if x > 0]
+    weight = 10.0 * sum(MATERIAL_DENSITIES.get(L.material, 1.0) * L.thickness_cm for L in layers)
+    return StackDesign(layers, float(cost), float(sum(L.thickness_cm for L in layers)), weight, feasible)
+
+
+def optimize_stack(k: float, r_m: float, D_safe: float, radiation_type: str = "Гамма", max_layers: int = 3,
+                   max_thickness=None, max_weight=None, costs: dict | None = None, step: float | None = None,
+                   buildup: bool = False) -> StackDesign:
+    # Single design query. The LP only sees Σμx (narrow beam); with buildup the target is
+    # tightened by B of the current design, D_safe / B, until the stack meets D_safe with its
+    # buildup factor as well. B grows slower than exp(Σμx), so the iteration converges from below.
+    target = D_safe
+    for _ in range(BUILDUP_ROUNDS):
+        design = _stack_design(k, r_m, target, radiation_type, max_layers, max_thickness, max_weight, costs, step)
+        if not buildup or not design.feasible or not design.layers:
+            return design
+        D = dose(k, r_m, design.layers, radiation_type, buildup=True)
+        if D <= D_safe * (1 + BUILDUP_RTOL):
+            return design
+        target *= D_safe / D * (1 - BUILDUP_RTOL)
+    design.feasible = False
+    return design
+
+
+# --- Cost vs dose Pareto frontier ---
+
+def skyline(cost: np.ndarray, dose: np.ndarray) -> np.ndarray:
+    # Indices of non-dominated (cost, dose) points, both minimized; O(n log n), sorted by cost
+    order = np.lexsort((dose, cost))
+    d = dose[order]
+    if d.size == 0:
+        return order
+    prev_best = np.minimum.accumulate(d)
+    keep = np.empty(d.size, dtype=bool)
+    keep[0] = True
+    keep[1:] = d[1:] < prev_best[:-1]
+    return order[keep]
+
+
+def pareto_frontier(k: float, r_m: float, radiation_type: str = "Гамма", max_layers: int = 3, thickness_grid=None,
+                    costs: dict | None = None, materials=None, chunk: int = 1_000_000,
+                    max_candidates: int | None = None, seed: int = 0) -> dict:
+    # Enumerates material subsets × thickness grids (or samples max_candidates of them), evaluates
+    # dose and cost chunk by chunk and keeps only the running skyline, so memory stays at one chunk.
+    materials = list(MATERIALS) if materials is None else list(materials)
+    costs = {**MATERIAL_COSTS, **(costs or {})}
+    c = np.array([costs.get(m, 10.0) for m in materials], dtype=float)
+    mu = mu_values(materials, radiation_type)
+    grid = np.arange(0.5, 20.0 + 1e-9, 0.5) if thickness_grid is None else np.asarray(thickness_grid, dtype=float)
+    scale = float(k) / max(float(r_m), 1e-3) ** 2
+    supports = [list(s) for n in range(1, min(max_layers, len(materials)) + 1) for s in combinations(range(len(materials)), n)]
+    sizes = np.array([grid.size ** len(s) for s in supports], dtype=float)
+    total = float(sizes.sum())
+    rng = np.random.default_rng(seed)
+    keep_fraction = 1.0 if not max_candidates or max_candidates >= total else max_candidates / total
+
+    # the unshielded design is always on the frontier
+    front_cost = np.zeros(1)
+    front_dose = np.array([scale])
+    front_x = np.zeros((1, len(materials)))
+    evaluated = 0
+    for idx, n in zip(supports, sizes.astype(np.int64)):
+        s = len(idx)
+        # sampled grid points are drawn directly, so the cost follows max_candidates, not the grid
+        picks = None if keep_fraction >= 1.0 else np.sort(rng.choice(int(n), max(1, round(n * keep_fraction)), replace=False))
+        for start in range(0, int(n) if picks is None else picks.size, chunk):
+            flat = np.arange(start, min(start + chunk, int(n))) if picks is None else picks[start:start + chunk]
+            x = grid[np.stack(np.unravel_index(flat, (grid.size,) * s), axis=1)]
+            cost = x @ c[idx]
+            dose = scale * np.exp(-(x @ mu[idx]))
+            evaluated += flat.size
+            sel = skyline(cost, dose)
+            x_full = np.zeros((sel.size, len(materials)))
+            x_full[:, idx] = x[sel]
+            cost_all = np.concatenate([front_cost, cost[sel]])
+            dose_all = np.concatenate([front_dose, dose[sel]])
+            x_all = np.vstack([front_x, x_full])
+            merged = skyline(cost_all, dose_all)
+            front_cost, front_dose, front_x = cost_all[merged], dose_all[merged], x_all[merged]
+    return {
+        "materials": materials,
+        "cost": front_cost,
+        "dose": front_dose,
+        "thickness": front_x,
+        "evaluated": evaluated,
+        "grid_size": int(total),
+    }
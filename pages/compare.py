@@ -1,38 +1,43 @@
-import json
+import hashlib
 import numpy as np
 import pandas as pd
 import streamlit as st
 import plotly.graph_objects as go
-from model import ShieldLayer, dose_curve
+from model import pack_scenarios, dose_matrix, radius_grid, zone_radii
+from scenario_store import open_store
 
 TEXTS = {
     "RU": {
         "page_title": "Сравнение сценариев",
         "title": "Сравнение двух сценариев",
-        "need_two": "Нужно минимум два сохранённых сценария в файле scenarios/my_scenarios.json (создайте их на главной странице).",
+        "need_two": "Нужно минимум два сохранённых сценария в хранилище scenarios/scenarios.db (создайте их на главной странице).",
         "scenario_A": "Сценарий A",
         "scenario_B": "Сценарий B",
         "ylog": "Логарифмическая шкала по D",
+        "export_png_prepare": "Подготовить PNG сравнения",
         "export_png": "Скачать сравнение как PNG",
         "png_unavailable": "Экспорт PNG недоступен",
         "probe": "Проверочное расстояние r_probe (м)",
         "metricA": "D_A(r={r:.2f})",
         "metricB": "D_B(r={r:.2f})",
-        "export_csv": "Скачать данные сравнения как CSV"
+        "export_csv": "Скачать данные сравнения как CSV",
+        "r_safe": "r_safe {name}: {r:.2f} м (красная зона ближе {r_red:.2f} м)"
     },
     "EN": {
         "page_title": "Scenario Comparison",
         "title": "Compare two scenarios",
-        "need_two": "At least two saved scenarios are required in scenarios/my_scenarios.json (create them on the main page).",
+        "need_two": "At least two saved scenarios are required in scenarios/scenarios.db (create them on the main page).",
         "scenario_A": "Scenario A",
         "scenario_B": "Scenario B",
         "ylog": "Logarithmic scale for D",
+        "export_png_prepare": "Prepare comparison as PNG",
         "export_png": "Download comparison as PNG",
         "png_unavailable": "PNG export not available",
         "probe": "Probe distance r_probe (m)",
         "metricA": "D_A(r={r:.2f})",
         "metricB": "D_B(r={r:.2f})",
-        "export_csv": "Download comparison data as CSV"
+        "export_csv": "Download comparison data as CSV",
+        "r_safe": "r_safe {name}: {r:.2f} m (red zone closer than {r_red:.2f} m)"
     }
 }
 
@@ -44,15 +49,8 @@ lang = st.sidebar.selectbox("Язык / Language", ["RU", "EN"], index=0)
 
 st.title(T(lang, "title"))
 
-def load_scenarios(path="scenarios/my_scenarios.json"):
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
-
-sc = load_scenarios()
-names = sorted(sc.keys())
+store = open_store()
+names = store.names()
 
 if len(names) < 2:
     st.info(T(lang, "need_two"))
@@ -63,10 +61,7 @@ else:
     with col2:
         n2 = st.selectbox(T(lang, "scenario_B"), names, index=1 if len(names) > 1 else 0)
 
-    def mk_layers(raw):
-        return [ShieldLayer(material=L['material'], thickness_cm=float(L['thickness_cm'])) for L in raw]
-
-    A = sc[n1]; B = sc[n2]
+    A = store.get(n1); B = store.get(n2)
     # Metadata
     metaA = {k: A.get(k) for k in ["radiation_type", "author", "note", "saved_at"]}
     metaB = {k: B.get(k) for k in ["radiation_type", "author", "note", "saved_at"]}
@@ -76,9 +71,13 @@ else:
     st.caption(f"B: type={metaB.get('radiation_type')}, author={metaB.get('author')}, saved_at={metaB.get('saved_at')}")
     if metaB.get("note"):
         st.caption(f"B note: {metaB.get('note')}")
-    layersA = mk_layers(A["layers"]); layersB = mk_layers(B["layers"])
-    rA, dA = dose_curve(A["k"], layersA, 0.1, 10.0, num=400, radiation_type=A.get("radiation_type", "Гамма"))
-    rB, dB = dose_curve(B["k"], layersB, 0.1, 10.0, num=400, radiation_type=B.get("radiation_type", "Гамма"))
+    batch = pack_scenarios([(n1, A), (n2, B)])
+    rA = rB = radius_grid(0.1, 10.0, num=400)
+    dA, dB = dose_matrix(batch, rA)
+    att = batch.attenuation()
+    r_safe, r_red = zone_radii(batch.k, att, batch.D_safe)
+    for i, nm in enumerate((n1, n2)):
+        st.caption(T(lang, "r_safe").format(name=nm, r=r_safe[i], r_red=r_red[i]))
 
     fig = go.Figure()
     fig.add_scatter(x=rA, y=dA, mode="lines", name=f"{n1}")
@@ -91,12 +90,17 @@ else:
         fig.update_yaxes(type="log", exponentformat="power")
     st.plotly_chart(fig, use_container_width=True)
 
-    # PNG export
-    try:
-        png_bytes = fig.to_image(format="png", scale=2)
-        st.download_button(T(lang, "export_png"), data=png_bytes, file_name="comparison.png", mime="image/png")
-    except Exception as e:
-        st.caption(f"{T(lang, 'png_unavailable')}: {e}")
+    # PNG export: kaleido is slow to start, so render only on request; the PNG is kept for the
+    # figure it shows, so the download button survives reruns
+    fig_key = hashlib.sha1(fig.to_json().encode("utf-8")).hexdigest()
+    if st.button(T(lang, "export_png_prepare")):
+        try:
+            st.session_state["png_comparison"] = (fig_key, fig.to_image(format="png", scale=2))
+        except Exception as e:
+            st.caption(f"{T(lang, 'png_unavailable')}: {e}")
+    png = st.session_state.get("png_comparison")
+    if png and png[0] == fig_key:
+        st.download_button(T(lang, "export_png"), data=png[1], file_name="comparison.png", mime="image/png")
 
     # CSV export on rA grid
     df = pd.DataFrame({"r": rA, f"D_{n1}": dA})
@@ -108,11 +112,8 @@ else:
                        file_name="comparison.csv", mime="text/csv")
 
     r_probe = st.slider(T(lang, "probe"), 0.1, 10.0, 2.0, 0.1)
-    def interp_val(r_arr, d_arr, r):
-        i = int(np.clip(np.searchsorted(r_arr, r), 0, len(r_arr)-1))
-        return float(d_arr[i])
-    dA_probe = interp_val(rA, dA, r_probe)
-    dB_probe = interp_val(rB, dB, r_probe)
+    # exact values at the probe instead of the nearest grid point
+    dA_probe, dB_probe = (batch.k * att / r_probe ** 2).tolist()
 
     colm = st.columns(2)
     with colm[0]:
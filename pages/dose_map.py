@@ -0,0 +1,156 @@
+import time
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from geometry import Scene, scene_dose_map, wall
+from model import MATERIALS, RADIATION_TYPES, ShieldLayer, mu_version, source_strengths
+
+TEXTS = {
+    "RU": {
+        "title": "Карта дозы по плану помещения",
+        "desc": "Суммарная D от нескольких источников (каждый со своим экраном) на сетке точек плана.",
+        "rad_type": "Вид излучения",
+        "width": "Ширина плана (м)",
+        "height": "Глубина плана (м)",
+        "resolution": "Точек сетки по длинной стороне",
+        "D_safe": "Порог D_safe (отн.)",
+        "buildup": "Учитывать фактор накопления",
+        "cull": "Отбрасывать пренебрежимо малые вклады (< 0.1% D_safe)",
+        "sources": "Источники",
+        "walls": "Стены и перегородки (лучи источник → точка считаются с реальной длиной пути через стену)",
+        "random": "Случайные источники",
+        "n_random": "Количество",
+        "generate": "Сгенерировать",
+        "stats": "{s} источн. × {p:,} точек, стен: {w}: {t:.2f} с ({rate:,.0f} лучей/с)",
+        "share": "Доля площади в зелёной зоне: {g:.0%}, в красной: {r:.0%}",
+    },
+    "EN": {
+        "title": "Floor-plan dose map",
+        "desc": "Total D from several sources (each behind its own shield) over a grid of floor-plan points.",
+        "rad_type": "Radiation type",
+        "width": "Plan width (m)",
+        "height": "Plan depth (m)",
+        "resolution": "Grid points along the long side",
+        "D_safe": "Threshold D_safe (rel.)",
+        "buildup": "Include buildup factor",
+        "cull": "Drop negligible contributions (< 0.1% of D_safe)",
+        "sources": "Sources",
+        "walls": "Walls and partitions (each source → point ray uses its actual path length through the wall)",
+        "random": "Random sources",
+        "n_random": "Count",
+        "generate": "Generate",
+        "stats": "{s} sources × {p:,} points, walls: {w}: {t:.2f} s ({rate:,.0f} rays/s)",
+        "share": "Area share in the green zone: {g:.0%}, in the red zone: {r:.0%}",
+    }
+}
+
+def T(lang, key):
+    return TEXTS.get(lang, TEXTS["RU"]).get(key, key)
+
+DEFAULT_SOURCES = pd.DataFrame({
+    "x": [3.0, 12.0, 7.0],
+    "y": [4.0, 6.0, 11.0],
+    "k": [2.0, 1.0, 3.0],
+    "material": ["Бетон", "Свинец", "Сталь"],
+    "thickness_cm": [10.0, 1.0, 2.0],
+})
+
+DEFAULT_WALLS = pd.DataFrame({
+    "x0": [9.0, 0.0],
+    "y0": [0.0, 9.0],
+    "x1": [9.0, 6.0],
+    "y1": [8.0, 9.0],
+    "thickness_cm": [30.0, 20.0],
+    "material": ["Бетон", "Бетон"],
+})
+
+def build_scene(walls: pd.DataFrame, rad_type: str) -> Scene:
+    return Scene([
+        wall(float(w.x0), float(w.y0), float(w.x1), float(w.y1), float(w.thickness_cm), str(w.material))
+        for w in walls.itertuples()
+    ], rad_type)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def compute_map(sources: pd.DataFrame, walls: pd.DataFrame, rad_type: str, width: float, height: float, n: int,
+                cutoff: float | None, buildup: bool, mu_rev: int = 0):
+    # mu_rev only keys the cache so a new μ override invalidates old maps
+    scale = n / max(width, height)
+    x = np.linspace(0.0, width, max(int(width * scale), 2))
+    y = np.linspace(0.0, height, max(int(height * scale), 2))
+    layers = [[ShieldLayer(str(m), float(th))] for m, th in zip(sources["material"], sources["thickness_cm"])]
+    k_eff = source_strengths(sources["k"].to_numpy(float), layers, rad_type, buildup=buildup)
+    t0 = time.perf_counter()
+    D = scene_dose_map(sources[["x", "y"]].to_numpy(float), k_eff, x, y, build_scene(walls, rad_type), cutoff=cutoff)
+    return x, y, D, time.perf_counter() - t0
+
+st.set_page_config(page_title="Dose map", layout="wide")
+lang = st.sidebar.selectbox("Язык / Language", ["RU", "EN"], index=0)
+
+st.title(T(lang, "title"))
+st.caption(T(lang, "desc"))
+
+rad_type = st.sidebar.selectbox(T(lang, "rad_type"), RADIATION_TYPES, index=0)
+width = st.sidebar.slider(T(lang, "width"), 5.0, 100.0, 15.0, 1.0)
+height = st.sidebar.slider(T(lang, "height"), 5.0, 100.0, 15.0, 1.0)
+n = st.sidebar.slider(T(lang, "resolution"), 50, 1000, 300, 50)
+D_safe = st.sidebar.slider(T(lang, "D_safe"), 0.01, 1.0, 0.2, 0.01)
+buildup = st.sidebar.checkbox(T(lang, "buildup"), value=False)
+cull = st.sidebar.checkbox(T(lang, "cull"), value=True)
+
+with st.sidebar.expander(T(lang, "random")):
+    n_random = st.number_input(T(lang, "n_random"), 1, 5000, 100, 10)
+    if st.button(T(lang, "generate")):
+        rng = np.random.default_rng()
+        st.session_state["dose_map_sources"] = pd.DataFrame({
+            "x": rng.uniform(0, width, n_random).round(2),
+            "y": rng.uniform(0, height, n_random).round(2),
+            "k": rng.uniform(0.1, 5.0, n_random).round(2),
+            "material": rng.choice(list(MATERIALS), n_random),
+            "thickness_cm": rng.uniform(0.0, 10.0, n_random).round(1),
+        })
+
+st.markdown("#### " + T(lang, "sources"))
+sources = st.data_editor(
+    st.session_state.get("dose_map_sources", DEFAULT_SOURCES),
+    num_rows="dynamic",
+    use_container_width=True,
+    column_config={"material": st.column_config.SelectboxColumn(options=list(MATERIALS))},
+    key="dose_map_editor",
+)
+sources = sources.dropna(subset=["x", "y", "k"]).fillna({"material": "Бетон", "thickness_cm": 0.0})
+
+st.markdown("#### " + T(lang, "walls"))
+walls = st.data_editor(
+    DEFAULT_WALLS,
+    num_rows="dynamic",
+    use_container_width=True,
+    column_config={"material": st.column_config.SelectboxColumn(options=list(MATERIALS))},
+    key="dose_map_walls",
+)
+walls = walls.dropna(subset=["x0", "y0", "x1", "y1"]).fillna({"material": "Бетон", "thickness_cm": 20.0})
+
+x, y, D, elapsed = compute_map(sources, walls, rad_type, width, height, n, 1e-3 * D_safe if cull else None, buildup, mu_version())
+rays = len(sources) * D.size
+st.caption(T(lang, "stats").format(s=len(sources), p=D.size, w=len(walls), t=elapsed,
+                                   rate=rays / elapsed if elapsed > 0 else 0.0))
+st.caption(T(lang, "share").format(g=float((D <= D_safe).mean()), r=float((D > 3 * D_safe).mean())))
+
+with np.errstate(divide="ignore"):
+    z = np.log10(np.maximum(D, 1e-12))
+fig = go.Figure(go.Heatmap(x=x, y=y, z=z, colorscale="Inferno", colorbar=dict(title="log10 D"),
+                           zmin=np.log10(D_safe) - 2, zmax=np.log10(D_safe) + 2))
+for level, color in ((D_safe, "#66bb6a"), (3 * D_safe, "#ef5350")):
+    fig.add_trace(go.Contour(
+        x=x, y=y, z=z, showscale=False, hoverinfo="skip",
+        contours=dict(start=np.log10(level), end=np.log10(level), size=1, coloring="lines"),
+        line=dict(color=color, width=2),
+    ))
+fig.add_trace(go.Scatter(x=sources["x"], y=sources["y"], mode="markers", marker=dict(color="cyan", symbol="x", size=9),
+                         text=[f"k={k:.2f}, {m} {th:.1f} cm" for k, m, th in zip(sources["k"], sources["material"], sources["thickness_cm"])],
+                         hoverinfo="text", showlegend=False))
+for b in build_scene(walls, rad_type).boxes:
+    fig.add_shape(type="rect", x0=b.lo[0], y0=b.lo[1], x1=b.hi[0], y1=b.hi[1],
+                  line=dict(color="#90a4ae", width=1), fillcolor="#90a4ae", opacity=0.8)
+fig.update_layout(xaxis_title="x (m)", yaxis_title="y (m)", height=640, yaxis=dict(scaleanchor="x"))
+st.plotly_chart(fig, use_container_width=True)
@@ -1,28 +1,37 @@
-import io, json, zipfile
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
-from model import ShieldLayer, dose_curve
+from exposure import decay_constant, decay_integral
+from model import pack_scenarios, dose_matrix, radius_grid
+from render import render_pngs
+from bundle import StageTimings, ZipStreamWriter, replace_session_file, sweep_temp_files
+from scenario_store import open_store
 
 TEXTS = {
     "RU": {
         "title": "Экспорт пакета артефактов (PNG+CSV)",
         "desc": "Соберите ZIP с графиками и данными для выбранных сценариев. Если выбрать 2 сценария — будет добавлено сравнение.",
-        "pick": "Выберите 1–2 сценария",
+        "pick": "Выберите сценарии",
         "make": "Сформировать ZIP",
         "ok": "Готово: сформирован ZIP с {n} файлами.",
+        "rendering": "Рендер PNG: {done}/{total}",
+        "timings": "Время по этапам, с (всего {total:.2f})",
         "include_mu": "Добавить таблицу μ (CSV)",
-        "include_override": "Добавить текущий пресет μ (mu_override.json, если есть)"
+        "include_override": "Добавить текущий пресет μ (mu_override.json, если есть)",
+        "shift_hours": "Длительность смены для накопленной дозы H (ч, с учётом распада источника)"
     },
     "EN": {
         "title": "Export bundle (PNG+CSV)",
         "desc": "Build a ZIP with charts and data for selected scenarios. If you select 2 scenarios, a comparison is added.",
-        "pick": "Select 1–2 scenarios",
+        "pick": "Select scenarios",
         "make": "Build ZIP",
         "ok": "Done: ZIP with {n} files created.",
+        "rendering": "Rendering PNG: {done}/{total}",
+        "timings": "Stage timings, s (total {total:.2f})",
         "include_mu": "Include μ table (CSV)",
-        "include_override": "Include current μ preset (mu_override.json, if present)"
+        "include_override": "Include current μ preset (mu_override.json, if present)",
+        "shift_hours": "Shift length for the accumulated dose H (h, with source decay)"
     }
 }
 
@@ -35,31 +44,22 @@ lang = st.sidebar.selectbox("Язык / Language", ["RU", "EN"], index=0)
 st.title(T(lang, "title"))
 st.caption(T(lang, "desc"))
 
-# Load scenarios
-import os, json
-os.makedirs("scenarios", exist_ok=True)
-path = "scenarios/my_scenarios.json"
-try:
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-except Exception:
-    data = {}
-
-names = sorted(list(data.keys()))
-sel = st.multiselect(T(lang, "pick"), names, max_selections=2)
+# Load scenario names; payloads are fetched only for the selection
+import os
+store = open_store()
+names = store.names()
+sel = st.multiselect(T(lang, "pick"), names)
+data = store.get_many(sel)
 
 inc_mu = st.checkbox(T(lang, "include_mu"), value=True)
 inc_override = st.checkbox(T(lang, "include_override"), value=True)
+shift_hours = st.number_input(T(lang, "shift_hours"), 0.0, 24.0 * 365, 8.0, 0.5)
 
-def mk_layers(raw):
-    return [ShieldLayer(material=L['material'], thickness_cm=float(L['thickness_cm'])) for L in raw]
-
-def make_curve_png_csv(name: str, sc: dict):
-    layers = mk_layers(sc["layers"])
-    r, d = dose_curve(sc["k"], layers, 0.1, 10.0, num=400, radiation_type=sc.get("radiation_type", "Гамма"))
+def make_curve_csv_fig(name: str, sc: dict, r, d):
     # CSV
     df = pd.DataFrame({"r": r, "D": d})
-    csv_bytes = df.to_csv(index=False).encode("utf-8")
+    # dose accumulated at every r over one shift starting now, the source decaying meanwhile
+    df["H_shift"] = d * float(decay_integral(decay_constant(sc.get("half_life_h")), 0.0, shift_hours))
     # PNG
     fig = go.Figure()
     meta = {
@@ -79,19 +79,15 @@ def make_curve_png_csv(name: str, sc: dict):
     if meta['note']:
         fig.add_annotation(xref="paper", yref="paper", x=0, y=1.12, showarrow=False,
                            text=(meta['note'][:120] + ('…' if len(meta['note'])>120 else '')))
-    png_bytes = fig.to_image(format="png", scale=2)
-    return csv_bytes, png_bytes
+    return df, fig
 
-def make_compare_png_csv(nameA, scA, nameB, scB):
-    layersA = mk_layers(scA["layers"]); layersB = mk_layers(scB["layers"])
-    rA, dA = dose_curve(scA["k"], layersA, 0.1, 10.0, num=400, radiation_type=scA.get("radiation_type", "Гамма"))
-    rB, dB = dose_curve(scB["k"], layersB, 0.1, 10.0, num=400, radiation_type=scB.get("radiation_type", "Гамма"))
+def make_compare_csv_fig(nameA, scA, dA, nameB, scB, dB, r):
+    rA = rB = r
     # CSV on rA grid
     def interp(r_arr, d_arr, r):
         i = int(np.clip(np.searchsorted(r_arr, r), 0, len(r_arr)-1))
         return float(d_arr[i])
     df = pd.DataFrame({"r": rA, f"D_{nameA}": dA, f"D_{nameB}": [interp(rB, dB, rv) for rv in rA]})
-    csv_bytes = df.to_csv(index=False).encode("utf-8")
     # PNG
     fig = go.Figure()
     fig.add_scatter(x=rA, y=dA, mode="lines", name=nameA)
@@ -99,29 +95,50 @@ def make_compare_png_csv(nameA, scA, nameB, scB):
     fig.add_hline(y=scA["D_safe"], line_dash="dot", annotation_text="D_safe (A)")
     fig.update_layout(xaxis_title="r (m)" if lang=="EN" else "r (м)",
                       yaxis_title="Dose rate D (rel.)" if lang=="EN" else "D (отн.)")
-    png_bytes = fig.to_image(format="png", scale=2)
-    return csv_bytes, png_bytes
+    return df, fig
+
+def iter_artifacts(sel, r_grid, D):
+    # One scenario at a time: (csv arcname, DataFrame, png arcname, figure)
+    for name in sel:
+        df, fig = make_curve_csv_fig(name, data[name], r_grid, D[name])
+        safe_name = name.replace("/", "_").replace("\\", "_")
+        yield f"{safe_name}/curve.csv", df, f"{safe_name}/curve.png", fig
+    # Comparison if two selected
+    if len(sel) == 2:
+        a, b = sel
+        df, fig = make_compare_csv_fig(a, data[a], D[a], b, data[b], D[b], r_grid)
+        yield f"{a}_VS_{b}/comparison.csv", df, f"{a}_VS_{b}/comparison.png", fig
 
 if st.button(T(lang, "make")) and sel:
-    files = []
-    mem = io.BytesIO()
-    with zipfile.ZipFile(mem, "w", zipfile.ZIP_DEFLATED) as zf:
-        # Per‑scenario artifacts
-        for name in sel:
-            sc = data[name]
-            csv_b, png_b = make_curve_png_csv(name, sc)
-            safe_name = name.replace("/", "_").replace("\\", "_")
-            zf.writestr(f"{safe_name}/curve.csv", csv_b)
-            zf.writestr(f"{safe_name}/curve.png", png_b)
-            files += [f"{safe_name}/curve.csv", f"{safe_name}/curve.png"]
-        # Comparison if two selected
-        if len(sel) == 2:
-            a, b = sel
-            scA, scB = data[a], data[b]
-            csv_b, png_b = make_compare_png_csv(a, scA, b, scB)
-            zf.writestr(f"{a}_VS_{b}/comparison.csv", csv_b)
-            zf.writestr(f"{a}_VS_{b}/comparison.png", png_b)
-            files += [f"{a}_VS_{b}/comparison.csv", f"{a}_VS_{b}/comparison.png"]
+    sweep_temp_files()
+    timings = StageTimings()
+    # All selected curves in one vectorized evaluation
+    with timings.stage("dose_matrix"):
+        r_grid = radius_grid(0.1, 10.0, num=400)
+        D = dict(zip(sel, dose_matrix(pack_scenarios([(n, data[n]) for n in sel]), r_grid)))
+    n_png = len(sel) + (len(sel) == 2)
+    with ZipStreamWriter(timings=timings) as zw:
+        def png_jobs():
+            # CSVs go straight into the archive; each figure is built only when the renderer
+            # has room for it, so at most a few figures and PNGs are alive at a time
+            for csv_name, df, png_name, fig in iter_artifacts(sel, r_grid, D):
+                zw.write_text(csv_name, lambda f, df=df: df.to_csv(f, index=False))
+                yield png_name, fig
+
+        progress = st.progress(0.0, text=T(lang, "rendering").format(done=0, total=n_png))
+        pngs = render_pngs(png_jobs(), scale=2)
+        done = 0
+        while True:
+            # building the figures overlaps with rendering, so both are timed together
+            with timings.stage("figures_png"):
+                item = next(pngs, None)
+            if item is None:
+                break
+            arcname, png_b = item
+            zw.write_bytes(arcname, png_b)
+            del item, png_b
+            done += 1
+            progress.progress(done / n_png, text=T(lang, "rendering").format(done=done, total=n_png))
         # μ table and override
         if inc_mu:
             # Build merged μ active table in CSV via model import
@@ -129,12 +146,12 @@ if st.button(T(lang, "make")) and sel:
             types = list(MU_ACTIVE.keys())
             mats = sorted({m for t in types for m in MU_ACTIVE[t].keys()})
             df_mu = pd.DataFrame({t: [MU_ACTIVE[t].get(m, None) for m in mats] for t in types}, index=mats)
-            zf.writestr("mu_table.csv", df_mu.to_csv().encode("utf-8"))
-            files.append("mu_table.csv")
+            zw.write_text("mu_table.csv", df_mu.to_csv)
         if inc_override and os.path.exists("data/mu_override.json"):
-            with open("data/mu_override.json", "rb") as f:
-                zf.writestr("mu_override.json", f.read())
-            files.append("mu_override.json")
-    mem.seek(0)
-    st.success(T(lang, "ok").format(n=len(files)))
-    st.download_button("Download ZIP", data=mem, file_name="bundle.zip", mime="application/zip")
+            zw.write_file("mu_override.json", "data/mu_override.json")
+    replace_session_file(st.session_state, "export_bundle_zip", zw.path)
+    st.success(T(lang, "ok").format(n=len(zw.names)))
+    st.caption(T(lang, "timings").format(total=timings.total()))
+    st.dataframe(pd.DataFrame(timings.rows()), hide_index=True)
+    with zw.open() as f:
+        st.download_button("Download ZIP", data=f, file_name="bundle.zip", mime="application/zip")
@@ -0,0 +1,136 @@
+import time
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from exposure import Segment, batch_exposure, cumulative_dose, decay_constant
+from model import pack_scenarios
+from scenario_store import open_store
+
+TEXTS = {
+    "RU": {
+        "title": "Накопленная доза за смену",
+        "desc": "H = ∫ D(r(t))·exp(-λt) dt по графику работ: источник распадается, работники перемещаются. "
+                "Все отрезки всех работников считаются одним векторизованным проходом.",
+        "need_one": "Нет сохранённых сценариев в хранилище scenarios/scenarios.db (создайте их на главной странице).",
+        "pick": "Сценарии (источники)",
+        "half_lives": "Период полураспада по сценариям (ч, пусто или 0 — без распада)",
+        "schedule": "График работ: отрезки времени и расстояния (r_end пусто — работник стоит на месте)",
+        "buildup": "Учитывать фактор накопления",
+        "D_limit": "Допустимая доза за смену H_max (отн.·ч)",
+        "totals": "Доза по работникам",
+        "cumulative": "Накопленная доза H(t)",
+        "t_axis": "Время от начала смены (ч)",
+        "h_axis": "H (отн.·ч)",
+        "stats": "{n} отрезков, {w} работников: {ms:.1f} мс",
+        "over": "Превышение H_max: {names}",
+        "download": "Скачать CSV",
+    },
+    "EN": {
+        "title": "Accumulated shift dose",
+        "desc": "H = ∫ D(r(t))·exp(-λt) dt over the work schedule: the source decays while workers move. "
+                "All segments of all workers are evaluated in one vectorized pass.",
+        "need_one": "No saved scenarios in scenarios/scenarios.db (create them on the main page).",
+        "pick": "Scenarios (sources)",
+        "half_lives": "Half-life per scenario (h, empty or 0 = no decay)",
+        "schedule": "Work schedule: time and distance segments (empty r_end = the worker stays put)",
+        "buildup": "Include buildup factor",
+        "D_limit": "Shift dose limit H_max (rel.·h)",
+        "totals": "Dose per worker",
+        "cumulative": "Accumulated dose H(t)",
+        "t_axis": "Time since shift start (h)",
+        "h_axis": "H (rel.·h)",
+        "stats": "{n} segments, {w} workers: {ms:.1f} ms",
+        "over": "H_max exceeded: {names}",
+        "download": "Download CSV",
+    }
+}
+
+def T(lang, key):
+    return TEXTS.get(lang, TEXTS["RU"]).get(key, key)
+
+st.set_page_config(page_title="Exposure", layout="wide")
+lang = st.sidebar.selectbox("Язык / Language", ["RU", "EN"], index=0)
+
+st.title(T(lang, "title"))
+st.caption(T(lang, "desc"))
+
+store = open_store()
+names = store.names()
+if not names:
+    st.info(T(lang, "need_one"))
+    st.stop()
+
+sel = st.multiselect(T(lang, "pick"), names, default=names[:2])
+if not sel:
+    st.stop()
+data = store.get_many(sel)
+buildup = st.sidebar.checkbox(T(lang, "buildup"), value=False)
+D_limit = st.sidebar.number_input(T(lang, "D_limit"), 0.0, 1e6, 1.0, 0.1)
+
+st.markdown("#### " + T(lang, "half_lives"))
+half_lives = st.data_editor(
+    pd.DataFrame({"scenario": sel, "half_life_h": [data[n].get("half_life_h") for n in sel]}, dtype=object),
+    disabled=["scenario"],
+    use_container_width=True,
+    key="exposure_half_lives",
+)
+scenarios = {
+    n: {**data[n], "half_life_h": pd.to_numeric(h, errors="coerce")}
+    for n, h in zip(half_lives["scenario"], half_lives["half_life_h"])
+}
+
+st.markdown("#### " + T(lang, "schedule"))
+default_plan = pd.DataFrame({
+    "worker": ["A", "A", "A", "B", "B"],
+    "scenario": [sel[0], sel[0], sel[-1], sel[-1], sel[0]],
+    "start_h": [0.0, 1.0, 2.0, 0.0, 4.0],
+    "duration_h": [1.0, 0.5, 2.0, 3.0, 4.0],
+    "r_start": [2.0, 2.0, 3.0, 5.0, 1.5],
+    "r_end": [2.0, 0.5, np.nan, 5.0, 4.0],
+})
+plan = st.data_editor(
+    default_plan,
+    num_rows="dynamic",
+    use_container_width=True,
+    column_config={"scenario": st.column_config.SelectboxColumn(options=sel)},
+    key="exposure_plan",
+)
+plan = plan.dropna(subset=["worker", "scenario", "start_h", "duration_h", "r_start"])
+plan = plan[plan["scenario"].isin(sel)].reset_index(drop=True)
+if plan.empty:
+    st.stop()
+
+t0 = time.perf_counter()
+res = batch_exposure(scenarios, plan[["worker", "scenario", "start_h", "duration_h", "r_start", "r_end"]].itertuples(index=False),
+                     buildup=buildup)
+elapsed = time.perf_counter() - t0
+plan["H"] = res["segment_dose"]
+st.caption(T(lang, "stats").format(n=len(plan), w=len(res["workers"]), ms=1000 * elapsed))
+
+totals = pd.DataFrame({"worker": res["workers"], "H": res["worker_dose"]})
+st.markdown("#### " + T(lang, "totals"))
+st.dataframe(totals, use_container_width=True)
+over = totals.loc[totals["H"] > D_limit, "worker"].tolist()
+if over:
+    st.error(T(lang, "over").format(names=", ".join(over)))
+
+# H(t) per worker: each segment contributes its scenario's k·attenuation and λ
+batch = pack_scenarios([(n, scenarios[n]) for n in sel])
+k_att = dict(zip(sel, batch.k * batch.attenuation(buildup)))
+t_end = float((plan["start_h"] + plan["duration_h"]).max())
+t_grid = np.linspace(0.0, max(t_end, 1e-3), 400)
+fig = go.Figure()
+for worker, rows in plan.groupby("worker", sort=True):
+    H = np.zeros_like(t_grid)
+    for row in rows.itertuples():
+        seg = Segment(row.start_h, row.duration_h, row.r_start, None if pd.isna(row.r_end) else row.r_end)
+        lam = float(decay_constant(scenarios[row.scenario].get("half_life_h")))
+        H += cumulative_dose(k_att[row.scenario], lam, [seg], t_grid)
+    fig.add_scatter(x=t_grid, y=H, mode="lines", name=str(worker))
+if D_limit > 0:
+    fig.add_hline(y=D_limit, line_dash="dot", annotation_text="H_max")
+fig.update_layout(title=T(lang, "cumulative"), xaxis_title=T(lang, "t_axis"), yaxis_title=T(lang, "h_axis"), height=480)
+st.plotly_chart(fig, use_container_width=True)
+
+st.download_button(T(lang, "download"), plan.to_csv(index=False).encode("utf-8"), file_name="exposure.csv", mime="text/csv")
@@ -1,5 +1,10 @@
+import time
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
 import streamlit as st
-from model import MATERIALS, MATERIAL_COSTS, ShieldLayer, dose
+from model import MATERIALS, MATERIAL_COSTS, ShieldLayer, dose, mu_version
+from optimizer import pareto_frontier
 
 TEXTS = {
     "RU": {
@@ -17,7 +22,18 @@ TEXTS = {
         "delta": "Снижение ΔD",
         "total_cost": "Итого стоимость экрана (условн.)",
         "bc": "Показатель «снижение на единицу стоимости»: {v:.6f}",
-        "need_values": "Добавьте толщины или цену, чтобы рассчитать показатель."
+        "need_values": "Добавьте толщины или цену, чтобы рассчитать показатель.",
+        "pareto_title": "Парето-фронт: стоимость vs D",
+        "pareto_desc": "Перебор пакетов из всех материалов (толщины по сетке); показаны только недоминируемые варианты — дешевле нельзя получить меньшую D.",
+        "pareto_layers": "Макс. число слоёв",
+        "pareto_step": "Шаг толщины (см)",
+        "pareto_max": "Макс. толщина слоя (см)",
+        "pareto_frontier": "Парето-фронт",
+        "pareto_current": "Текущий экран",
+        "pareto_stats": "Проверено вариантов: {n:,}, на фронте: {f}, время {t:.2f} с",
+        "pareto_sampled": "Сетка содержит {total:,} пакетов — проверена случайная выборка; для полного перебора увеличьте шаг или уменьшите макс. толщину.",
+        "pareto_cost": "Стоимость (условн.)",
+        "pareto_table": "Точки фронта"
     },
     "EN": {
         "page_title": "Cost vs ΔDose",
@@ -34,7 +50,18 @@ TEXTS = {
         "delta": "Reduction ΔD",
         "total_cost": "Total cost (units)",
         "bc": "Benefit per cost: {v:.6f}",
-        "need_values": "Add thickness/prices to compute the metric."
+        "need_values": "Add thickness/prices to compute the metric.",
+        "pareto_title": "Pareto frontier: cost vs D",
+        "pareto_desc": "Stacks from all materials on a thickness grid; only non-dominated designs are shown (nothing cheaper gives a lower D).",
+        "pareto_layers": "Max layers",
+        "pareto_step": "Thickness step (cm)",
+        "pareto_max": "Max layer thickness (cm)",
+        "pareto_frontier": "Pareto frontier",
+        "pareto_current": "Current shield",
+        "pareto_stats": "Designs evaluated: {n:,}, on frontier: {f}, time {t:.2f} s",
+        "pareto_sampled": "The grid has {total:,} stacks, so a random sample was evaluated; use a larger step or a smaller max thickness for the full search.",
+        "pareto_cost": "Cost (units)",
+        "pareto_table": "Frontier points"
     }
 }
 
@@ -89,3 +116,46 @@ if cost_total > 0:
     st.info(T(lang, "bc").format(v=bc))
 else:
     st.warning(T(lang, "need_values"))
+
+st.divider()
+st.subheader(T(lang, "pareto_title"))
+st.caption(T(lang, "pareto_desc"))
+pc = st.columns(3)
+with pc[0]:
+    max_layers = st.slider(T(lang, "pareto_layers"), 1, 3, 3, 1)
+with pc[1]:
+    step = st.select_slider(T(lang, "pareto_step"), [0.25, 0.5, 1.0, 2.0], value=0.5)
+with pc[2]:
+    max_th = st.slider(T(lang, "pareto_max"), 1.0, 50.0, 20.0, 1.0)
+
+# fine steps with thick layers make ~1e8 stacks: beyond this the grid is sampled
+PARETO_MAX_CANDIDATES = 2_000_000
+
+@st.cache_data(max_entries=32)
+def frontier(k, r, max_layers, step, max_th, costs, mu_rev):
+    # mu_rev only keys the cache
+    t0 = time.perf_counter()
+    res = pareto_frontier(k, r, max_layers=max_layers, thickness_grid=np.arange(step, max_th + 1e-9, step), costs=dict(costs),
+                          max_candidates=PARETO_MAX_CANDIDATES)
+    return res, time.perf_counter() - t0
+
+unit_costs = tuple(sorted(MATERIAL_COSTS.items()))
+front, elapsed = frontier(k, r, max_layers, step, max_th, unit_costs, mu_version())
+st.caption(T(lang, "pareto_stats").format(n=front["evaluated"], f=len(front["cost"]), t=elapsed))
+if front["evaluated"] < front["grid_size"]:
+    st.caption(T(lang, "pareto_sampled").format(total=front["grid_size"]))
+
+labels = [
+    " + ".join(f"{m} {x:g}" for m, x in zip(front["materials"], row) if x > 0) or "—"
+    for row in front["thickness"]
+]
+fig = go.Figure()
+fig.add_scatter(x=front["cost"], y=front["dose"], mode="lines+markers", name=T(lang, "pareto_frontier"),
+                text=labels, hovertemplate="%{text}<br>cost=%{x:.1f}<br>D=%{y:.3g}<extra></extra>")
+fig.add_scatter(x=[cost_total], y=[D_with], mode="markers", marker=dict(size=12, symbol="x"), name=T(lang, "pareto_current"))
+fig.update_layout(xaxis_title=T(lang, "pareto_cost"), yaxis_title="D")
+fig.update_yaxes(type="log", exponentformat="power")
+st.plotly_chart(fig, use_container_width=True)
+with st.expander(T(lang, "pareto_table")):
+    st.dataframe(pd.DataFrame({"stack": labels, "cost": front["cost"], "D": front["dose"]}), hide_index=True)
+
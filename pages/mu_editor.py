@@ -1,7 +1,6 @@
-import json, os
 import pandas as pd
 import streamlit as st
-from model import MU_BY_TYPE, MU_ACTIVE
+from model import MU_BY_TYPE, MU_ACTIVE, MU_REGISTRY
 
 TEXTS = {
     "RU": {
@@ -144,14 +143,9 @@ with col1:
                             out[t][m] = valf
                         except Exception:
                             pass
-            os.makedirs("data", exist_ok=True)
-            with open("data/mu_override.json", "w", encoding="utf-8") as f:
-                json.dump(out, f, ensure_ascii=False, indent=2)
+            MU_REGISTRY.save(out)
             st.success(T(lang, "saved"))
 with col2:
     if st.button(T(lang, "reset")):
-        try:
-            os.remove("data/mu_override.json")
-        except FileNotFoundError:
-            pass
+        MU_REGISTRY.reset()
         st.info(T(lang, "reset_ok"))
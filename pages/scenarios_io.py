@@ -1,10 +1,17 @@
-import os, io, json, zipfile, datetime
+import os, json, zipfile, datetime, tempfile
 import streamlit as st
+from bundle import TEMP_PREFIXES, ZipStreamWriter, replace_session_file, sweep_temp_files
+from scenario_store import open_store
 
 TEXTS = {
     "RU": {
         "title": "Экспорт / Импорт сценариев",
         "current": "Текущие сценарии",
+        "total": "Всего сценариев: {n}",
+        "page": "Страница",
+        "filter_type": "Фильтр по виду излучения",
+        "all_types": "Все",
+        "prepare_export": "Подготовить экспорт",
         "export_json": "Скачать все сценарии (JSON)",
         "export_zip": "Скачать архив (ZIP)",
         "import_label": "Загрузите JSON или ZIP со сценариями",
@@ -18,6 +25,11 @@ TEXTS = {
     "EN": {
         "title": "Scenarios export / import",
         "current": "Current scenarios",
+        "total": "Scenarios in store: {n}",
+        "page": "Page",
+        "filter_type": "Filter by radiation type",
+        "all_types": "All",
+        "prepare_export": "Prepare export",
         "export_json": "Download all scenarios (JSON)",
         "export_zip": "Download archive (ZIP)",
         "import_label": "Upload JSON or ZIP with scenarios",
@@ -38,27 +50,36 @@ lang = st.sidebar.selectbox("Язык / Language", ["RU", "EN"], index=0)
 
 st.title(T(lang, "title"))
 
-os.makedirs("scenarios", exist_ok=True)
-path = "scenarios/my_scenarios.json"
-try:
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-except Exception:
-    data = {}
+store = open_store()
+PAGE_SIZE = 50
 
 st.subheader(T(lang, "current"))
-st.json(data)
+all_label = T(lang, "all_types")
+type_filter = st.selectbox(T(lang, "filter_type"), [all_label, "Гамма", "Бета", "Альфа", "Нейтроны"], index=0)
+rtype = None if type_filter == all_label else type_filter
+total = store.count(radiation_type=rtype)
+st.caption(T(lang, "total").format(n=total))
+pages = max(1, -(-total // PAGE_SIZE))
+page = st.number_input(T(lang, "page"), 1, pages, 1, 1)
+st.json(dict(store.list_page(offset=(int(page) - 1) * PAGE_SIZE, limit=PAGE_SIZE, radiation_type=rtype)))
 
-# Export buttons
-buf = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
-st.download_button(T(lang, "export_json"), data=buf, file_name="scenarios.json", mime="application/json")
+# Export: streamed out of the store into temp files only on request
+if st.button(T(lang, "prepare_export")):
+    sweep_temp_files()
+    fd, json_path = tempfile.mkstemp(prefix=TEMP_PREFIXES[1], suffix=".json")
+    os.close(fd)
+    store.export_json(json_path)
+    replace_session_file(st.session_state, "scenarios_io_json", json_path)
+    with ZipStreamWriter() as zw:
+        zw.write_file("scenarios.json", json_path)
+    replace_session_file(st.session_state, "scenarios_io_zip", zw.path)
 
-# ZIP export
-zip_buf = io.BytesIO()
-with zipfile.ZipFile(zip_buf, "w", zipfile.ZIP_DEFLATED) as zf:
-    zf.writestr("scenarios.json", buf)
-zip_buf.seek(0)
-st.download_button(T(lang, "export_zip"), data=zip_buf, file_name="scenarios.zip", mime="application/zip")
+if os.path.exists(st.session_state.get("scenarios_io_json", "")):
+    with open(st.session_state["scenarios_io_json"], "rb") as f:
+        st.download_button(T(lang, "export_json"), data=f, file_name="scenarios.json", mime="application/json")
+if os.path.exists(st.session_state.get("scenarios_io_zip", "")):
+    with open(st.session_state["scenarios_io_zip"], "rb") as f:
+        st.download_button(T(lang, "export_zip"), data=f, file_name="scenarios.zip", mime="application/zip")
 
 # Import
 st.subheader(T(lang, "import_label"))
@@ -88,13 +109,14 @@ if st.button(T(lang, "import_btn")) and uploaded is not None:
 
     if isinstance(incoming, dict):
         conflicts = 0
-        imported = 0
+        pending = {}
         for k, v in incoming.items():
-            if k in data:
+            if not isinstance(v, dict):
+                continue
+            if store.exists(k) or k in pending:
                 conflicts += 1
                 if strategy == T(lang, "strat_overwrite"):
-                    data[k] = v
-                    imported += 1
+                    pending[k] = v
                 elif strategy == T(lang, "strat_keep"):
                     continue
                 else:
@@ -102,17 +124,14 @@ if st.button(T(lang, "import_btn")) and uploaded is not None:
                     suffix = " (imported)"
                     new_key = k + suffix
                     idx = 1
-                    while new_key in data:
+                    while store.exists(new_key) or new_key in pending:
                         idx += 1
                         new_key = f"{k}{suffix} {idx}"
-                    data[new_key] = v
-                    imported += 1
+                    pending[new_key] = v
             else:
-                data[k] = v
-                imported += 1
-        # Save back
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+                pending[k] = v
+        # Save back: one transaction, only the imported rows
+        imported = store.upsert_many(pending.items())
         st.success(T(lang, "import_ok").format(n=imported, c=conflicts))
     else:
         st.error("No scenarios found in uploaded file")
@@ -0,0 +1,123 @@
+import time
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+from model import MATERIALS, RADIATION_TYPES, ShieldLayer, mu_version
+from sweep import sweep
+
+TEXTS = {
+    "RU": {
+        "title": "Параметрический перебор: D по (r, толщина, k)",
+        "desc": "Полная декартова сетка параметров считается одним векторизованным проходом; ниже — срезы куба.",
+        "rad_type": "Вид излучения",
+        "k_range": "Диапазон k",
+        "r_range": "Диапазон r (м)",
+        "n_points": "Точек по оси",
+        "layer1": "Слой 1: материалы",
+        "layer1_th": "Слой 1: макс. толщина (см)",
+        "layer2": "Добавить второй слой",
+        "layer2_mat": "Слой 2: материал",
+        "layer2_th": "Слой 2: макс. толщина (см)",
+        "D_safe": "Порог D_safe (контур)",
+        "x_axis": "Ось X",
+        "y_axis": "Ось Y",
+        "fixed": "Фиксированные параметры",
+        "surface": "Показать 3D-поверхность",
+        "stats": "Куб {shape}: {n:,} точек за {t:.2f} с",
+        "need_two": "Для тепловой карты нужно минимум два перебираемых параметра.",
+    },
+    "EN": {
+        "title": "Parameter sweep: D over (r, thickness, k)",
+        "desc": "The full Cartesian parameter grid is evaluated in one vectorized pass; slices of the cube are shown below.",
+        "rad_type": "Radiation type",
+        "k_range": "k range",
+        "r_range": "r range (m)",
+        "n_points": "Points per axis",
+        "layer1": "Layer 1: materials",
+        "layer1_th": "Layer 1: max thickness (cm)",
+        "layer2": "Add a second layer",
+        "layer2_mat": "Layer 2: material",
+        "layer2_th": "Layer 2: max thickness (cm)",
+        "D_safe": "Threshold D_safe (contour)",
+        "x_axis": "X axis",
+        "y_axis": "Y axis",
+        "fixed": "Fixed parameters",
+        "surface": "Show 3D surface",
+        "stats": "Cube {shape}: {n:,} points in {t:.2f} s",
+        "need_two": "A heat map needs at least two swept parameters.",
+    }
+}
+
+def T(lang, key):
+    return TEXTS.get(lang, TEXTS["RU"]).get(key, key)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def run_sweep(k_range, r_range, n, rad_type, mats1, th1, mat2, th2, mu_rev=0):
+    thickness = {0: np.linspace(0.0, th1, n)}
+    layers = [ShieldLayer(mats1[0], 0.0)]
+    if mat2:
+        layers.append(ShieldLayer(mat2, 0.0))
+        thickness[1] = np.linspace(0.0, th2, max(n // 4, 2))
+    material = {0: list(mats1)} if len(mats1) > 1 else {}
+    t0 = time.perf_counter()
+    cube = sweep(k=np.linspace(*k_range, n), r=np.linspace(*r_range, n), layers=layers,
+                 thickness=thickness, material=material, radiation_type=rad_type)
+    return cube, time.perf_counter() - t0
+
+st.set_page_config(page_title="Sweep", layout="wide")
+lang = st.sidebar.selectbox("Язык / Language", ["RU", "EN"], index=0)
+
+st.title(T(lang, "title"))
+st.caption(T(lang, "desc"))
+
+rad_type = st.sidebar.selectbox(T(lang, "rad_type"), RADIATION_TYPES, index=0)
+k_range = st.sidebar.slider(T(lang, "k_range"), 0.1, 5.0, (0.5, 5.0), 0.1)
+r_range = st.sidebar.slider(T(lang, "r_range"), 0.1, 10.0, (0.5, 10.0), 0.1)
+n = st.sidebar.slider(T(lang, "n_points"), 10, 200, 80, 10)
+mats1 = st.sidebar.multiselect(T(lang, "layer1"), list(MATERIALS.keys()), default=["Свинец"]) or ["Свинец"]
+th1 = st.sidebar.slider(T(lang, "layer1_th"), 0.5, 50.0, 10.0, 0.5)
+mat2, th2 = None, 0.0
+if st.sidebar.checkbox(T(lang, "layer2")):
+    mat2 = st.sidebar.selectbox(T(lang, "layer2_mat"), list(MATERIALS.keys()), index=1)
+    th2 = st.sidebar.slider(T(lang, "layer2_th"), 0.5, 100.0, 20.0, 0.5)
+D_safe = st.sidebar.slider(T(lang, "D_safe"), 0.01, 1.0, 0.2, 0.01)
+
+cube, elapsed = run_sweep(k_range, r_range, n, rad_type, tuple(mats1), th1, mat2, th2, mu_rev=mu_version())
+st.caption(T(lang, "stats").format(shape=" × ".join(f"{d}={s}" for d, s in zip(cube.dims, cube.shape)),
+                                   n=cube.values.size, t=elapsed))
+
+if len(cube.dims) < 2:
+    st.info(T(lang, "need_two"))
+    st.stop()
+
+c1, c2 = st.columns(2)
+x_dim = c1.selectbox(T(lang, "x_axis"), cube.dims, index=cube.dims.index("r"))
+y_choices = [d for d in cube.dims if d != x_dim]
+y_dim = c2.selectbox(T(lang, "y_axis"), y_choices, index=y_choices.index("thickness_0") if "thickness_0" in y_choices else 0)
+
+fixed = {}
+others = [d for d in cube.dims if d not in (x_dim, y_dim)]
+if others:
+    st.markdown("#### " + T(lang, "fixed"))
+    cols = st.columns(len(others))
+    for col, d in zip(cols, others):
+        options = list(cube.coords[d])
+        fixed[d] = col.select_slider(d, options=options, value=options[len(options) // 2],
+                                     format_func=lambda v: f"{v:.3g}" if isinstance(v, float) else str(v))
+slice_ = cube.sel(**fixed).transpose(y_dim, x_dim)
+x, y = slice_.coords[x_dim], slice_.coords[y_dim]
+with np.errstate(divide="ignore"):
+    z = np.log10(slice_.values)
+
+fig = go.Figure(go.Heatmap(x=x, y=y, z=z, colorscale="Inferno", colorbar=dict(title="log10 D")))
+fig.add_trace(go.Contour(
+    x=x, y=y, z=z, contours=dict(start=np.log10(D_safe), end=np.log10(D_safe), size=1, coloring="lines"),
+    line=dict(color="white", width=2, dash="dash"), showscale=False, name="D_safe",
+))
+fig.update_layout(xaxis_title=x_dim, yaxis_title=y_dim, height=520)
+st.plotly_chart(fig, use_container_width=True)
+
+if st.checkbox(T(lang, "surface")):
+    fig3 = go.Figure(go.Surface(x=x, y=y, z=z, colorscale="Inferno", colorbar=dict(title="log10 D")))
+    fig3.update_layout(scene=dict(xaxis_title=x_dim, yaxis_title=y_dim, zaxis_title="log10 D"), height=620)
+    st.plotly_chart(fig3, use_container_width=True)
@@ -0,0 +1,82 @@
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+from model import MATERIALS, RADIATION_TYPES, zone_radius_grid
+
+TEXTS = {
+    "RU": {
+        "title": "Карта зон: безопасное расстояние по k и толщине",
+        "desc": "r_safe = √(k·exp(−μx)/D_safe) считается аналитически для всей сетки k × толщина × материал.",
+        "rad_type": "Вид излучения",
+        "material": "Материал экрана",
+        "D_safe": "Порог D_safe (отн.)",
+        "k_max": "Макс. k",
+        "th_max": "Макс. толщина (см)",
+        "r_probe": "Расстояние для карты зон r (м)",
+        "r_safe_map": "r_safe (м)",
+        "zone_map": "Зона на расстоянии r = {r:.2f} м",
+        "thickness": "Толщина (см)",
+        "zones": ["зелёная", "жёлтая", "красная"],
+    },
+    "EN": {
+        "title": "Zone map: safe distance over k and thickness",
+        "desc": "r_safe = √(k·exp(−μx)/D_safe) is computed analytically over the whole k × thickness × material grid.",
+        "rad_type": "Radiation type",
+        "material": "Shield material",
+        "D_safe": "Threshold D_safe (rel.)",
+        "k_max": "Max k",
+        "th_max": "Max thickness (cm)",
+        "r_probe": "Distance for the zone map r (m)",
+        "r_safe_map": "r_safe (m)",
+        "zone_map": "Zone at r = {r:.2f} m",
+        "thickness": "Thickness (cm)",
+        "zones": ["green", "yellow", "red"],
+    }
+}
+
+def T(lang, key):
+    return TEXTS.get(lang, TEXTS["RU"]).get(key, key)
+
+st.set_page_config(page_title="Zone map", layout="wide")
+lang = st.sidebar.selectbox("Язык / Language", ["RU", "EN"], index=0)
+
+st.title(T(lang, "title"))
+st.caption(T(lang, "desc"))
+
+rad_type = st.sidebar.selectbox(T(lang, "rad_type"), RADIATION_TYPES, index=0)
+material = st.sidebar.selectbox(T(lang, "material"), list(MATERIALS.keys()), index=0)
+D_safe = st.sidebar.slider(T(lang, "D_safe"), 0.01, 1.0, 0.2, 0.01)
+k_max = st.sidebar.slider(T(lang, "k_max"), 0.5, 5.0, 5.0, 0.1)
+th_max = st.sidebar.slider(T(lang, "th_max"), 1.0, 50.0, 10.0, 0.5)
+r_probe = st.sidebar.slider(T(lang, "r_probe"), 0.1, 10.0, 2.0, 0.1)
+
+k_grid = np.linspace(0.1, k_max, 200)
+th_grid = np.linspace(0.0, th_max, 200)
+materials = list(MATERIALS.keys())
+r_safe, r_red = zone_radius_grid(k_grid, th_grid, materials, D_safe, rad_type)
+j = materials.index(material)
+r_safe_m, r_red_m = r_safe[:, :, j], r_red[:, :, j]
+
+col1, col2 = st.columns(2)
+with col1:
+    st.markdown("#### " + T(lang, "r_safe_map"))
+    fig = go.Figure(go.Contour(
+        x=th_grid, y=k_grid, z=r_safe_m, colorscale="Viridis",
+        contours=dict(showlabels=True), colorbar=dict(title="r_safe"),
+    ))
+    fig.update_layout(xaxis_title=T(lang, "thickness"), yaxis_title="k", height=480)
+    st.plotly_chart(fig, use_container_width=True)
+
+with col2:
+    st.markdown("#### " + T(lang, "zone_map").format(r=r_probe))
+    zone = np.where(r_probe >= r_safe_m, 0, np.where(r_probe >= r_red_m, 1, 2))
+    names = T(lang, "zones")
+    fig = go.Figure(go.Heatmap(
+        x=th_grid, y=k_grid, z=zone, zmin=0, zmax=2,
+        colorscale=[[0.0, "#66bb6a"], [0.33, "#66bb6a"], [0.34, "#ffca28"], [0.66, "#ffca28"], [0.67, "#ef5350"], [1.0, "#ef5350"]],
+        colorbar=dict(tickvals=[0, 1, 2], ticktext=names),
+        customdata=np.array(names, dtype=object)[zone],
+        hovertemplate="x=%{x:.2f} cm<br>k=%{y:.2f}<br>%{customdata}<extra></extra>",
+    ))
+    fig.update_layout(xaxis_title=T(lang, "thickness"), yaxis_title="k", height=480)
+    st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,103 @@
+import atexit
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+# Persistent pool of warm kaleido renderers shared by all sessions of the server process.
+# Figures travel as plotly JSON. kaleido>=1 starts a new Chromium for every to_image() unless
+# its sync server is running, so each worker starts that server once and plotly reuses it.
+
+_POOL: ProcessPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def default_workers() -> int:
+    return max(1, min(8, (os.cpu_count() or 2) - 1))
+
+
+def _warm_up() -> None:
+    try:
+        import kaleido
+        kaleido.start_sync_server(n=1, silence_warnings=True)
+        atexit.register(kaleido.stop_sync_server, silence_warnings=True)
+    except Exception:
+        # the real render reports the error (e.g. no kaleido or no Chrome) for each figure
+        pass
+
+
+def _render_json(fig_json: str, scale: float) -> bytes:
+    import plotly.io as pio
+    return pio.from_json(fig_json).to_image(format="png", scale=scale)
+
+
+def get_pool(workers: int | None = None) -> ProcessPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            # spawn: forking a threaded Streamlit server is unsafe
+            _POOL = ProcessPoolExecutor(
+                max_workers=workers or default_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_up,
+            )
+        return _POOL
+
+
+def shutdown_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL = None
+
+
+atexit.register(shutdown_pool)
+
+
+def render_pngs(figs, scale: float = 2, workers: int | None = None, max_in_flight: int | None = None):
+    # Yields (key, png_bytes) in completion order so callers can stream results out.
+    # `figs` is a dict or an iterable of (key, figure) pairs and is consumed lazily: at most
+    # max_in_flight renders (default 2 × workers) are pending, each figure is dropped once its
+    # JSON is submitted and each PNG once it has been yielded, so memory does not grow with
+    # the number of figures.
+    items = iter(figs.items() if isinstance(figs, dict) else figs)
+    first = next(items, None)
+    if first is None:
+        return
+    second = next(items, None)
+    if second is None or workers == 1:
+        for key, fig in itertools.chain([first], [second] if second else [], items):
+            yield key, fig.to_image(format="png", scale=scale)
+        return
+    workers = workers or default_workers()
+    pool = get_pool(workers)
+    max_in_flight = max(1, max_in_flight or 2 * workers)
+    items = itertools.chain([first, second], items)
+    del first, second
+    pending: dict = {}
+    try:
+        while True:
+            while len(pending) < max_in_flight:
+                item = next(items, None)
+                if item is None:
+                    break
+                key, fig = item
+                pending[pool.submit(_render_json, fig.to_json(), scale)] = key
+                del item, fig
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                key = pending.pop(fut)
+                yield key, fut.result()
+            del done, fut  # the finished futures hold their PNG bytes
+    except BrokenProcessPool:
+        # a crashed renderer poisons the pool; start a fresh one next time
+        shutdown_pool()
+        raise
+    finally:
+        for fut in pending:
+            fut.cancel()
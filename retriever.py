@@ -1,29 +1,433 @@
+import hashlib
+import itertools
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from scipy import sparse
+
+from ann import IVFIndex
+
+QA_CACHE_DIR = "data/.qa_index"
+# per-language knowledge bases (same question/answer layout) and their analyzers;
+# Chinese has no spaces between words, so it is indexed by character uni/bigrams
+QA_FILES = {"RU": "data/qa.csv", "EN": "data/qa_en.csv", "ZH": "data/qa_zh.csv"}
+QA_ANALYZERS = {"ZH": ("char", (1, 2))}
+# bases at least this large get an IVF backend when from_csv builds them
+ANN_MIN_SIZE = 200_000
+
+# TF-IDF with the TfidfVectorizer defaults (lowercase, \b\w\w+\b tokens, smooth idf, l2 rows), but
+# kept as raw term counts in CSR arrays: idf = ln((1 + n)/(1 + df)) + 1 and the row norms are
+# derived on demand, so adding or removing a pair only touches its own row and df.
+# Queries are scored against the normalized rows as a sparse product with the term → pair
+# posting matrix, so the cost follows the posting lists of the query terms, not the corpus.
+# Large bases can add an approximate IVF backend (ann.py) that scores only probed candidates.
+# from_csv persists the arrays under QA_CACHE_DIR/<sha1 of the csv and analyzer>/ and
+# memory-maps them on the next start instead of re-tokenizing the file.
+_TOKEN = re.compile(r"(?u)\b\w\w+\b")
+_RUN = re.compile(r"(?u)\w+")
+_ARRAYS = ("indptr", "indices", "counts")
+# every new or modified index gets a fresh version, so cached answers can never outlive it
+_VERSIONS = itertools.count(1)
+
+
+def make_analyzer(analyzer: str = "word", ngram_range: tuple[int, int] = (1, 1)):
+    # "word": TfidfVectorizer's default tokens (n-grams joined by spaces);
+    # "char": character n-grams inside runs of word characters (char_wb without the padding)
+    lo, hi = ngram_range
+    if analyzer == "char":
+        def analyze(text: str) -> list[str]:
+            out = []
+            for run in _RUN.findall(text.lower()):
+                for n in range(lo, hi + 1):
+                    out.extend(run[i:i + n] for i in range(len(run) - n + 1))
+            return out
+    elif analyzer == "word":
+        def analyze(text: str) -> list[str]:
+            words = _TOKEN.findall(text.lower())
+            if hi == 1:
+                return words
+            out = []
+            for n in range(lo, hi + 1):
+                out.extend(" ".join(words[i:i + n]) for i in range(len(words) - n + 1))
+            return out
+    else:
+        raise ValueError(f"unknown analyzer {analyzer!r} (expected 'word' or 'char')")
+    return analyze
+
+
+def file_hash(path: str, salt: str = "") -> str:
+    h = hashlib.sha1(salt.encode("utf-8"))
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
 
 class QAIndex:
-    def __init__(self, qa_pairs: list[tuple[str, str]]):
+    def __init__(self, qa_pairs: list[tuple[str, str]] = (), analyzer: str = "word",
+                 ngram_range: tuple[int, int] = (1, 1)):
+        self.analyzer = analyzer
+        self.ngram_range = tuple(ngram_range)
+        self._analyze = make_analyzer(analyzer, self.ngram_range)
+        self._vocab: dict[str, int] = {}
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int32)
+        self._counts = np.zeros(0, dtype=np.float32)
+        self._df = np.zeros(0, dtype=np.int64)
+        self._qa: list[list[str]] | None = [[], []]
+        self._qa_path: str | None = None
+        self._post: sparse.csr_matrix | None = None
+        self._idf_v: np.ndarray | None = None
+        self._rows: sparse.csr_matrix | None = None
+        self.ann: IVFIndex | None = None
+        self.version = next(_VERSIONS)
         if qa_pairs:
-            self.questions, self.answers = zip(*qa_pairs)
-        else:
-            self.questions, self.answers = [], []
-        self.vectorizer = TfidfVectorizer()
-        if self.questions:
-            self.matrix = self.vectorizer.fit_transform(self.questions)
-        else:
-            self.matrix = None
+            self.add_many(qa_pairs)
 
     @classmethod
-    def from_csv(cls, path: str):
+    def from_csv(cls, path: str, cache_dir: str | None = QA_CACHE_DIR, analyzer: str = "word",
+                 ngram_range: tuple[int, int] = (1, 1)):
+        spec = f"{analyzer}{tuple(ngram_range)}"
+        key = os.path.join(cache_dir, file_hash(path, spec)) if cache_dir else None
+        if key and os.path.isfile(os.path.join(key, "qa.json")):
+            try:
+                return cls.load(key)
+            except (OSError, ValueError):
+                pass  # a damaged cache is rebuilt below
         df = pd.read_csv(path)
-        qa = [(str(q), str(a)) for q, a in zip(df["question"], df["answer"])]
-        return cls(qa)
-
-    def ask(self, query: str, topk: int = 1):
-        if not self.questions:
-            return []
-        qv = self.vectorizer.transform([query])
-        sims = cosine_similarity(qv, self.matrix).ravel()
-        idx = sims.argsort()[::-1][:topk]
-        return [(self.questions[i], self.answers[i], float(sims[i])) for i in idx]
+        index = cls([(str(q), str(a)) for q, a in zip(df["question"], df["answer"])], analyzer, ngram_range)
+        if len(index) >= ANN_MIN_SIZE:
+            index.build_ann()
+        if key:
+            try:
+                index.save(key)
+            except OSError:
+                pass  # read-only data dir: keep the in-memory index
+        return index
+
+    @classmethod
+    def load(cls, directory: str):
+        # arrays are memory-mapped; Q&A texts are read on the first answer
+        meta_path = os.path.join(directory, "meta.json")
+        meta = {}
+        if os.path.isfile(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        index = cls(analyzer=meta.get("analyzer", "word"), ngram_range=tuple(meta.get("ngram_range", (1, 1))))
+        with open(os.path.join(directory, "vocab.json"), encoding="utf-8") as f:
+            terms = json.load(f)
+        index._vocab = {t: i for i, t in enumerate(terms)}
+        index._indptr, index._indices, index._counts = (
+            np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in _ARRAYS
+        )
+        index._df = np.bincount(index._indices, minlength=len(terms)).astype(np.int64)
+        index._qa = None
+        index._qa_path = os.path.join(directory, "qa.json")
+        if os.path.isdir(os.path.join(directory, "ann")):
+            index.ann = IVFIndex.load(os.path.join(directory, "ann"))
+        return index
+
+    def save(self, directory: str) -> None:
+        # written next to the target and renamed, so readers never see a half-written index
+        parent = os.path.dirname(os.path.abspath(directory))
+        os.makedirs(parent, exist_ok=True)
+        tmp = f"{os.path.abspath(directory)}.tmp{os.getpid()}"
+        os.makedirs(tmp, exist_ok=True)
+        for name, arr in zip(_ARRAYS, (self._indptr, self._indices, self._counts)):
+            np.save(os.path.join(tmp, f"{name}.npy"), np.asarray(arr))
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"analyzer": self.analyzer, "ngram_range": list(self.ngram_range)}, f)
+        terms = sorted(self._vocab, key=self._vocab.get)
+        with open(os.path.join(tmp, "vocab.json"), "w", encoding="utf-8") as f:
+            json.dump(terms, f, ensure_ascii=False)
+        with open(os.path.join(tmp, "qa.json"), "w", encoding="utf-8") as f:
+            json.dump(self._pairs(), f, ensure_ascii=False)
+        if self.ann is not None:
+            self.ann.save(os.path.join(tmp, "ann"))
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+        os.replace(tmp, directory)
+
+    def _pairs(self) -> list[list[str]]:
+        if self._qa is None:
+            with open(self._qa_path, encoding="utf-8") as f:
+                self._qa = json.load(f)
+        return self._qa
+
+    @property
+    def questions(self) -> list[str]:
+        return self._pairs()[0]
+
+    @property
+    def answers(self) -> list[str]:
+        return self._pairs()[1]
+
+    def __len__(self) -> int:
+        return len(self._indptr) - 1
+
+    def normalize(self, query: str) -> str:
+        # queries with the same analyzer tokens get the same answers (case, spacing, punctuation)
+        return "\x1f".join(self._analyze(str(query)))
+
+    # --- incremental updates ---
+
+    def add(self, question: str, answer: str) -> int:
+        return self.add_many([(question, answer)])[0]
+
+    def add_many(self, qa_pairs) -> list[int]:
+        qa_pairs = [(str(q), str(a)) for q, a in qa_pairs]
+        start = len(self)
+        cols, counts, lengths = [], [], []
+        for q, _ in qa_pairs:
+            tf = Counter(self._analyze(q))
+            for term in tf:
+                if term not in self._vocab:
+                    self._vocab[term] = len(self._vocab)
+            cols.extend(self._vocab[t] for t in tf)
+            counts.extend(tf.values())
+            lengths.append(len(tf))
+        cols = np.array(cols, dtype=np.int32)
+        self._indices = np.concatenate([self._indices, cols])
+        self._counts = np.concatenate([self._counts, np.array(counts, dtype=np.float32)])
+        self._indptr = np.concatenate([self._indptr, self._indptr[-1] + np.cumsum(lengths, dtype=np.int64)])
+        self._df = np.concatenate([self._df, np.zeros(len(self._vocab) - len(self._df), dtype=np.int64)])
+        np.add.at(self._df, cols, 1)
+        pairs = self._pairs()
+        pairs[0].extend(q for q, _ in qa_pairs)
+        pairs[1].extend(a for _, a in qa_pairs)
+        self._post = self._idf_v = None
+        if self.ann is not None:
+            self.ann.add(self._tfidf_rows(start))
+        self.version = next(_VERSIONS)
+        return list(range(start, len(self)))
+
+    def remove(self, i: int) -> None:
+        if not -len(self) <= i < len(self):
+            raise IndexError(f"no Q&A pair {i} (index has {len(self)})")
+        i %= len(self)
+        a, b = int(self._indptr[i]), int(self._indptr[i + 1])
+        np.subtract.at(self._df, self._indices[a:b], 1)
+        self._indices = np.concatenate([self._indices[:a], self._indices[b:]])
+        self._counts = np.concatenate([self._counts[:a], self._counts[b:]])
+        self._indptr = np.concatenate([self._indptr[:i + 1], self._indptr[i + 2:] - (b - a)])
+        pairs = self._pairs()
+        del pairs[0][i], pairs[1][i]
+        self._post = self._idf_v = None
+        if self.ann is not None:
+            self.ann.remove(i)
+        self.version = next(_VERSIONS)
+
+    # --- scoring ---
+
+    def _idf(self) -> np.ndarray:
+        if self._idf_v is None:
+            self._idf_v = np.log((1.0 + len(self)) / (1.0 + self._df)) + 1.0
+        return self._idf_v
+
+    def _tfidf_rows(self, start: int = 0, stop: int | None = None) -> sparse.csr_matrix:
+        # l2-normalized TF-IDF rows start:stop under the current idf
+        stop = len(self) if stop is None else stop
+        ptr = np.asarray(self._indptr[start:stop + 1], dtype=np.int64)
+        cols = np.asarray(self._indices[ptr[0]:ptr[-1]])
+        data = np.asarray(self._counts[ptr[0]:ptr[-1]], dtype=np.float64) * self._idf()[cols]
+        lengths = np.diff(ptr)
+        if data.size:
+            norms = np.sqrt(np.add.reduceat(np.append(data * data, 0.0), ptr[:-1] - ptr[0]) * (lengths > 0))
+            data /= np.repeat(np.where(norms > 0, norms, 1.0), lengths)
+        return sparse.csr_matrix((data, cols, ptr - ptr[0]), shape=(stop - start, len(self._vocab)))
+
+    def _postings(self) -> sparse.csr_matrix:
+        # the normalized rows, also stored transposed (term × pair) so a query only reads the
+        # posting lists of its own terms; rebuilt after add()/remove()
+        if self._post is None:
+            self._rows = self._tfidf_rows()
+            self._post = self._rows.T.tocsr()
+        return self._post
+
+    def _query_matrix(self, queries: list[str]) -> sparse.csr_matrix:
+        idf = self._idf()
+        cols, vals, indptr = [], [], [0]
+        for query in queries:
+            # terms whose pairs were all removed stay in the vocabulary with df = 0; a refit
+            # would not know them, so they must not weigh in the query norm either
+            tf = Counter(j for j in (self._vocab.get(t) for t in self._analyze(query)) if j is not None and self._df[j] > 0)
+            w = np.fromiter(tf.values(), dtype=np.float64, count=len(tf)) * idf[list(tf)]
+            norm = np.sqrt((w * w).sum())
+            cols.extend(tf)
+            vals.append(w / norm if norm > 0 else w)
+            indptr.append(len(cols))
+        data = np.concatenate(vals) if vals else np.zeros(0)
+        return sparse.csr_matrix((data, np.array(cols, dtype=np.int64), indptr), shape=(len(queries), len(self._vocab)))
+
+    def _top(self, scores: np.ndarray, docs: np.ndarray, topk: int, min_score: float):
+        keep = scores > min_score
+        scores, docs = scores[keep], docs[keep]
+        if scores.size > topk:
+            part = np.argpartition(-scores, topk - 1)[:topk]
+            scores, docs = scores[part], docs[part]
+        order = np.argsort(-scores, kind="stable")
+        return [(self.questions[d], self.answers[d], float(s)) for d, s in zip(docs[order], scores[order])]
+
+    def ask_many(self, queries, topk: int = 1, min_score: float = 0.0, max_bytes: int = 64 * 2**20,
+                 nprobe: int | None = None, exact: bool = False):
+        # cosine top-k for many queries: one sparse product per block of queries, then
+        # argpartition over each query's non-zero scores only (pairs sharing no term score 0).
+        # Blocks are cut so that the score matrix (≤ Σ posting lengths per query) fits max_bytes.
+        # With an ANN backend (and not exact) only the probed candidates are scored.
+        queries = [str(q) for q in queries]
+        if not len(self) or not self._vocab:
+            return [[] for _ in queries]
+        post = self._postings()
+        Q = self._query_matrix(queries)
+        if self.ann is not None and not exact:
+            known = self.ann.components.shape[1]
+            cands = self.ann.candidates(Q if Q.shape[1] == known else Q[:, :known], nprobe)
+            return [self._top(self._rows[c] @ Q[i].toarray().ravel(), c, topk, min_score)
+                    for i, c in enumerate(cands)]
+        hits = sparse.csr_matrix((np.ones_like(Q.data), Q.indices, Q.indptr), shape=Q.shape) @ self._df
+        cost = np.minimum(hits, len(self))
+        group = (np.cumsum(cost) - cost) // max(max_bytes // 24, 1)  # ~24 bytes per score entry in the product
+        cuts = np.concatenate([[0], np.flatnonzero(np.diff(group)) + 1, [len(queries)]])
+        out = []
+        for a, b in zip(cuts[:-1], cuts[1:]):
+            S = (Q[a:b] @ post).tocsr()
+            for i in range(S.shape[0]):
+                rows = slice(S.indptr[i], S.indptr[i + 1])
+                out.append(self._top(S.data[rows], S.indices[rows], topk, min_score))
+        return out
+
+    def ask(self, query: str, topk: int = 1, min_score: float = 0.0, nprobe: int | None = None, exact: bool = False):
+        return self.ask_many([query], topk, min_score, nprobe=nprobe, exact=exact)[0]
+
+    # --- approximate search ---
+
+    def build_ann(self, **kwargs) -> IVFIndex:
+        # IVF backend for large bases (see ann.py); kwargs go to IVFIndex.build
+        self.ann = IVFIndex.build(self._tfidf_rows(), **kwargs)
+        self.version = next(_VERSIONS)
+        return self.ann
+
+
+class QueryCache:
+    # Process-wide LRU of answers shared by all sessions, keyed by index version and normalized
+    # query; entries expire after ttl_s seconds
+    def __init__(self, max_entries: int = 1024, ttl_s: float = 600.0):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._data: OrderedDict[tuple, tuple[float, list]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def ask(self, index: QAIndex, query: str, topk: int = 1, min_score: float = 0.0) -> list:
+        key = (index.version, index.normalize(query), int(topk), float(min_score))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and now - entry[0] <= self.ttl_s:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return list(entry[1])
+            if entry is not None:
+                del self._data[key]
+                self.expired += 1
+            self.misses += 1
+        answers = index.ask(query, topk, min_score)
+        with self._lock:
+            self._data[key] = (now, tuple(answers))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return answers
+
+    def invalidate(self, version: int | None = None) -> int:
+        # drop the answers of one index version (or everything); returns the number dropped
+        with self._lock:
+            stale = [k for k in self._data if version is None or k[0] == version]
+            for k in stale:
+                del self._data[k]
+            return len(stale)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._data),
+                "evictions": self.evictions,
+                "expired": self.expired,
+            }
+
+
+QA_QUERY_CACHE = QueryCache()
+
+
+class QARouter:
+    # one QAIndex per UI language, each built or memory-mapped on its first query; languages
+    # without a knowledge base fall back to `fallback`. An index is rebuilt when its CSV changes,
+    # and answers go through the shared query cache.
+    def __init__(self, files: dict[str, str] | None = None, analyzers: dict | None = None,
+                 fallback: str = "RU", cache_dir: str | None = QA_CACHE_DIR, cache: QueryCache | None = QA_QUERY_CACHE):
+        self.files = dict(QA_FILES if files is None else files)
+        self.analyzers = dict(QA_ANALYZERS if analyzers is None else analyzers)
+        self.fallback = fallback
+        self.cache_dir = cache_dir
+        self.cache = cache
+        self._indexes: dict[str, QAIndex] = {}
+        self._stamps: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def language(self, lang: str) -> str:
+        return lang if lang in self.files and os.path.isfile(self.files[lang]) else self.fallback
+
+    def index(self, lang: str) -> QAIndex:
+        lang = self.language(lang)
+        try:
+            stamp = os.stat(self.files[lang]).st_mtime_ns
+        except (OSError, KeyError):
+            stamp = 0
+        with self._lock:
+            if lang in self._indexes and self._stamps.get(lang) != stamp:
+                self._drop(lang)
+            if lang not in self._indexes:
+                analyzer, ngram_range = self.analyzers.get(lang, ("word", (1, 1)))
+                try:
+                    self._indexes[lang] = QAIndex.from_csv(self.files[lang], self.cache_dir, analyzer, ngram_range)
+                except (OSError, KeyError, ValueError):
+                    self._indexes[lang] = QAIndex([], analyzer, ngram_range)
+                self._stamps[lang] = stamp
+            return self._indexes[lang]
+
+    def _drop(self, lang: str) -> None:
+        old = self._indexes.pop(lang, None)
+        if old is not None and self.cache is not None:
+            self.cache.invalidate(old.version)
+
+    def reload(self, lang: str | None = None) -> None:
+        with self._lock:
+            for name in ([lang] if lang else list(self._indexes)):
+                self._drop(name)
+
+    def loaded(self) -> list[str]:
+        return sorted(self._indexes)
+
+    def ask(self, query: str, lang: str, topk: int = 1, min_score: float = 0.0):
+        index = self.index(lang)
+        if self.cache is None:
+            return index.ask(query, topk, min_score)
+        return self.cache.ask(index, query, topk, min_score)
+
+    def ask_many(self, queries, lang: str, topk: int = 1, min_score: float = 0.0):
+        return self.index(lang).ask_many(queries, topk, min_score)
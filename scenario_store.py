@@ -0,0 +1,437 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+SCENARIOS_JSON = "scenarios/my_scenarios.json"
+SCENARIOS_DB = "scenarios/scenarios.db"
+LOCK_TIMEOUT_S = 10.0
+
+# Columns pulled out of the payload so they can be indexed; the payload keeps the full dict
+_INDEXED = ("radiation_type", "author", "saved_at")
+_ORDERS = {"name": "name", "saved_at": "saved_at", "radiation_type": "radiation_type, name", "author": "author, name"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    name TEXT PRIMARY KEY,
+    radiation_type TEXT,
+    author TEXT,
+    saved_at TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_scenarios_radiation_type ON scenarios(radiation_type);
+CREATE INDEX IF NOT EXISTS ix_scenarios_author ON scenarios(author);
+CREATE INDEX IF NOT EXISTS ix_scenarios_saved_at ON scenarios(saved_at);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def _row(name: str, scenario: dict) -> tuple:
+    return (
+        name,
+        scenario.get("radiation_type", "Гамма"),
+        scenario.get("author", ""),
+        scenario.get("saved_at", ""),
+        json.dumps(scenario, ensure_ascii=False),
+    )
+
+
+def _where(radiation_type: str | None, author: str | None) -> tuple[str, list]:
+    clauses, args = [], []
+    if radiation_type is not None:
+        clauses.append("radiation_type = ?")
+        args.append(radiation_type)
+    if author is not None:
+        clauses.append("author = ?")
+        args.append(author)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), args
+
+
+class ScenarioStore:
+    # SQLite (WAL) scenario repository; one connection per thread, safe across Streamlit sessions
+    def __init__(self, path: str = SCENARIOS_DB, legacy_json: str | None = SCENARIOS_JSON):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+        if legacy_json:
+            self.migrate_from_json(legacy_json)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # --- writes ---
+
+    def upsert(self, name: str, scenario: dict) -> None:
+        self.upsert_many([(name, scenario)])
+
+    def upsert_many(self, items) -> int:
+        rows = [_row(name, sc) for name, sc in items]
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT INTO scenarios(name, radiation_type, author, saved_at, payload) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET radiation_type=excluded.radiation_type, author=excluded.author, "
+                "saved_at=excluded.saved_at, payload=excluded.payload",
+                rows,
+            )
+        return len(rows)
+
+    def delete(self, name: str) -> bool:
+        with self._conn() as conn:
+            return conn.execute("DELETE FROM scenarios WHERE name = ?", (name,)).rowcount > 0
+
+    # --- reads ---
+
+    def get(self, name: str) -> dict | None:
+        row = self._conn().execute("SELECT payload FROM scenarios WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, names) -> dict:
+        names = list(names)
+        found = {}
+        for start in range(0, len(names), 500):
+            chunk = names[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            for name, payload in self._conn().execute(
+                f"SELECT name, payload FROM scenarios WHERE name IN ({marks})", chunk
+            ):
+                found[name] = json.loads(payload)
+        return {n: found[n] for n in names if n in found}
+
+    def exists(self, name: str) -> bool:
+        return self._conn().execute("SELECT 1 FROM scenarios WHERE name = ?", (name,)).fetchone() is not None
+
+    def names(self, radiation_type: str | None = None, author: str | None = None) -> list[str]:
+        where, args = _where(radiation_type, author)
+        return [r[0] for r in self._conn().execute(f"SELECT name FROM scenarios{where} ORDER BY name", args)]
+
+    def count(self, radiation_type: str | None = None, author: str | None = None) -> int:
+        where, args = _where(radiation_type, author)
+        return self._conn().execute(f"SELECT COUNT(*) FROM scenarios{where}", args).fetchone()[0]
+
+    def list_page(self, offset: int = 0, limit: int = 50, order_by: str = "name",
+                  radiation_type: str | None = None, author: str | None = None) -> list[tuple[str, dict]]:
+        where, args = _where(radiation_type, author)
+        order = _ORDERS.get(order_by, "name")
+        rows = self._conn().execute(
+            f"SELECT name, payload FROM scenarios{where} ORDER BY {order} LIMIT ? OFFSET ?",
+            args + [int(limit), int(offset)],
+        )
+        return [(name, json.loads(payload)) for name, payload in rows]
+
+    def iter_all(self, batch: int = 1000):
+        # name order, fetched in batches so large stores are never loaded at once
+        cur = self._conn().execute("SELECT name, payload FROM scenarios ORDER BY name")
+        while True:
+            rows = cur.fetchmany(batch)
+            if not rows:
+                return
+            for name, payload in rows:
+                yield name, json.loads(payload)
+
+    def to_dict(self) -> dict:
+        return dict(self.iter_all())
+
+    # --- JSON migration / export ---
+
+    def migrate_from_json(self, path: str = SCENARIOS_JSON, force: bool = False) -> int:
+        # One-shot import of the legacy my_scenarios.json; recorded in meta so it runs once
+        key = f"migrated:{os.path.abspath(path)}"
+        conn = self._conn()
+        if not force and conn.execute("SELECT 1 FROM meta WHERE key = ?", (key,)).fetchone():
+            return 0
+        legacy = JsonScenarioStore(path)
+        if not (os.path.exists(path) or os.path.exists(legacy.journal_path)):
+            return 0
+        # snapshot plus any journal entries not yet compacted
+        n = self.upsert_many((name, sc) for name, sc in legacy.iter_all() if isinstance(sc, dict))
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", (key, str(n)))
+        return n
+
+    def export_json(self, path: str) -> int:
+        return _write_json_atomic(path, self.iter_all())
+
+
+def _write_json_atomic(path: str, items) -> int:
+    # Streams (name, scenario) pairs out in the my_scenarios.json layout via temp file + os.replace
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    n = 0
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("{")
+            for name, sc in items:
+                f.write(",\n" if n else "\n")
+                f.write(f"  {json.dumps(name, ensure_ascii=False)}: {json.dumps(sc, ensure_ascii=False)}")
+                n += 1
+            f.write("\n}\n" if n else "}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return n
+
+
+# --- JSON backend: file lock + atomic replace + append-only journal ---
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock_fd(fd: int, exclusive: bool) -> None:
+        # msvcrt has no shared locks; readers take the exclusive one too. Non-blocking attempts
+        # until LOCK_TIMEOUT_S, then the last error is raised instead of hanging on a stale lock
+        deadline = time.monotonic() + LOCK_TIMEOUT_S
+        while True:
+            os.lseek(fd, 0, os.SEEK_SET)
+            try:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                return
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.05)
+
+    def _unlock_fd(fd: int) -> None:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_fd(fd: int, exclusive: bool) -> None:
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+    def _unlock_fd(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class FileLock:
+    # Advisory inter-process lock on a side file; also serializes threads of this process.
+    # Only writers create the side file: a shared hold without it means no writer has run, so
+    # read-only loads (e.g. the CLI --json input) leave nothing behind.
+    def __init__(self, path: str):
+        self.path = path
+        self._thread_lock = threading.RLock()
+
+    @contextmanager
+    def hold(self, exclusive: bool = True):
+        with self._thread_lock:
+            try:
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT if exclusive else os.O_RDONLY, 0o644)
+            except FileNotFoundError:
+                yield
+                return
+            try:
+                _lock_fd(fd, exclusive)
+                try:
+                    yield
+                finally:
+                    _unlock_fd(fd)
+            finally:
+                os.close(fd)
+
+
+class JsonScenarioStore:
+    # my_scenarios.json as a snapshot plus an append-only journal of saves/deletes.
+    # A save appends one line under the lock (O(1) in the number of scenarios); a background
+    # compaction folds the journal into the snapshot with write-to-temp + os.replace.
+    def __init__(self, path: str = SCENARIOS_JSON, compact_every: int = 200):
+        self.path = path
+        self.journal_path = os.path.splitext(path)[0] + ".journal"
+        self.compact_every = compact_every
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = FileLock(os.path.splitext(path)[0] + ".lock")
+        self._state_lock = threading.RLock()
+        self._data: dict = {}
+        self._snap_stamp = None
+        self._offset = 0
+        self._journal_entries = 0
+        self._compacting = threading.Event()
+
+    def _stamp(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _refresh(self) -> dict:
+        with self._state_lock, self._lock.hold(exclusive=False):
+            return self._refresh_locked()
+
+    def _refresh_locked(self) -> dict:
+        # Replays only the journal tail written since the last call; caller holds the file lock
+        with self._state_lock:
+            stamp = self._stamp()
+            if stamp != self._snap_stamp:
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                except Exception:
+                    data = {}
+                self._data = data if isinstance(data, dict) else {}
+                self._snap_stamp = stamp
+                self._offset = 0
+                self._journal_entries = 0
+            try:
+                with open(self.journal_path, "rb") as f:
+                    f.seek(self._offset)
+                    tail = f.read()
+            except FileNotFoundError:
+                tail = b""
+            end = tail.rfind(b"\n") + 1
+            for line in tail[:end].splitlines():
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # torn write from a crashed process
+                    continue
+                if entry.get("op") == "delete":
+                    self._data.pop(entry.get("name"), None)
+                elif isinstance(entry.get("scenario"), dict):
+                    self._data[entry["name"]] = entry["scenario"]
+                self._journal_entries += 1
+            self._offset += end
+            return self._data
+
+    def _append(self, entries: list[dict]) -> None:
+        payload = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries).encode("utf-8")
+        with self._lock.hold(exclusive=True):
+            with open(self.journal_path, "ab+") as f:
+                # never glue a new entry onto a torn line left by a crashed writer
+                if f.seek(0, os.SEEK_END):
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        payload = b"\n" + payload
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+        if self._refresh_count() >= self.compact_every:
+            self.compact_in_background()
+
+    def _refresh_count(self) -> int:
+        self._refresh()
+        return self._journal_entries
+
+    def compact(self) -> int:
+        with self._state_lock, self._lock.hold(exclusive=True):
+            data = dict(self._refresh_locked())
+            n = _write_json_atomic(self.path, data.items())
+            with open(self.journal_path, "wb"):
+                pass
+            self._snap_stamp = self._stamp()
+            self._offset = 0
+            self._journal_entries = 0
+            return n
+
+    def compact_in_background(self) -> None:
+        if self._compacting.is_set():
+            return
+        self._compacting.set()
+
+        def run():
+            try:
+                self.compact()
+            finally:
+                self._compacting.clear()
+
+        threading.Thread(target=run, name="scenario-journal-compaction", daemon=True).start()
+
+    # --- same interface as ScenarioStore ---
+
+    def upsert(self, name: str, scenario: dict) -> None:
+        self.upsert_many([(name, scenario)])
+
+    def upsert_many(self, items) -> int:
+        entries = [{"op": "upsert", "name": name, "scenario": sc} for name, sc in items]
+        if entries:
+            self._append(entries)
+        return len(entries)
+
+    def delete(self, name: str) -> bool:
+        existed = self.exists(name)
+        self._append([{"op": "delete", "name": name}])
+        return existed
+
+    def get(self, name: str) -> dict | None:
+        return self._refresh().get(name)
+
+    def get_many(self, names) -> dict:
+        data = self._refresh()
+        return {n: data[n] for n in names if n in data}
+
+    def exists(self, name: str) -> bool:
+        return name in self._refresh()
+
+    def _filtered(self, radiation_type: str | None, author: str | None):
+        for name, sc in self._refresh().items():
+            if radiation_type is not None and sc.get("radiation_type", "Гамма") != radiation_type:
+                continue
+            if author is not None and sc.get("author", "") != author:
+                continue
+            yield name, sc
+
+    def names(self, radiation_type: str | None = None, author: str | None = None) -> list[str]:
+        return sorted(name for name, _ in self._filtered(radiation_type, author))
+
+    def count(self, radiation_type: str | None = None, author: str | None = None) -> int:
+        return sum(1 for _ in self._filtered(radiation_type, author))
+
+    def list_page(self, offset: int = 0, limit: int = 50, order_by: str = "name",
+                  radiation_type: str | None = None, author: str | None = None) -> list[tuple[str, dict]]:
+        items = list(self._filtered(radiation_type, author))
+        if order_by in _INDEXED:
+            items.sort(key=lambda kv: (str(kv[1].get(order_by, "")), kv[0]))
+        else:
+            items.sort(key=lambda kv: kv[0])
+        return items[int(offset):int(offset) + int(limit)]
+
+    def iter_all(self, batch: int = 1000):
+        data = dict(self._refresh())
+        for name in sorted(data):
+            yield name, data[name]
+
+    def to_dict(self) -> dict:
+        return dict(self.iter_all())
+
+    def migrate_from_json(self, path: str = SCENARIOS_JSON, force: bool = False) -> int:
+        if os.path.abspath(path) == os.path.abspath(self.path) or not os.path.exists(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return self.upsert_many((n, sc) for n, sc in data.items() if isinstance(sc, dict))
+
+    def export_json(self, path: str) -> int:
+        return _write_json_atomic(path, self.iter_all())
+
+
+_STORES: dict = {}
+_STORES_LOCK = threading.Lock()
+
+
+def open_store(path: str | None = None, backend: str | None = None):
+    # backend: "sqlite" (default) or "json"; SHIELDING_SCENARIO_BACKEND overrides the default
+    backend = backend or os.environ.get("SHIELDING_SCENARIO_BACKEND", "sqlite")
+    if backend not in ("sqlite", "json"):
+        raise ValueError(f"unknown scenario backend: {backend}")
+    path = path or (SCENARIOS_JSON if backend == "json" else SCENARIOS_DB)
+    with _STORES_LOCK:
+        store = _STORES.get((backend, path))
+        if store is None:
+            store = ScenarioStore(path) if backend == "sqlite" else JsonScenarioStore(path)
+            _STORES[(backend, path)] = store
+        return store
@@ -0,0 +1,132 @@
+"""Headless batch evaluation of saved scenarios (no Streamlit / plotly).
+
+    python -m shielding --db scenarios/scenarios.db --out results.csv
+    python -m shielding --json scenarios/my_scenarios.json --mu data/new_mu.json --out results.parquet
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import model
+from exposure import decay_constant, decay_integral
+from model import MATERIALS, classify_zones, dose_matrix, pack_scenarios, radius_grid, recommended_thickness
+
+
+def load_scenarios(db: str | None = None, json_path: str | None = None) -> list[tuple[str, dict]]:
+    from scenario_store import JsonScenarioStore, ScenarioStore, open_store
+    if json_path:
+        store = JsonScenarioStore(json_path)
+    elif db:
+        store = ScenarioStore(db, legacy_json=None)
+    else:
+        store = open_store()
+    return list(store.iter_all())
+
+
+def _init_worker(mu_path: str | None) -> None:
+    if mu_path:
+        model.MU_REGISTRY = model.MuRegistry(mu_path)
+
+
+def evaluate_chunk(items: list[tuple[str, dict]], r_grid: np.ndarray | None = None,
+                   buildup: bool = False, shift_hours: float | None = None) -> tuple[pd.DataFrame, np.ndarray | None]:
+    batch = pack_scenarios(items)
+    r_current = np.array([float(sc.get("r_current", 1.0)) for _, sc in items], dtype=float)
+    att = batch.attenuation(buildup)
+    D_now = batch.k * att / np.maximum(r_current, 1e-3) ** 2
+    rad_types = np.array(batch.rad_types, dtype=object)[batch.rad_idx] if len(batch) else np.array([], dtype=object)
+    materials = list(MATERIALS)
+    thickness = np.full((len(batch), len(materials)), np.nan)
+    for rtype in batch.rad_types:
+        rows = rad_types == rtype
+        thickness[rows] = recommended_thickness(batch.k[rows], r_current[rows], batch.D_safe[rows], rtype, materials, buildup=buildup)
+    df = pd.DataFrame({
+        "name": batch.names,
+        "radiation_type": rad_types,
+        "k": batch.k,
+        "r_current": r_current,
+        "D_safe": batch.D_safe,
+        "attenuation": att,
+        "D": D_now,
+        "zone": classify_zones(D_now, batch.D_safe),
+    })
+    if shift_hours is not None:
+        # accumulated dose at r_current over one shift, with each scenario's half-life
+        lam = decay_constant([sc.get("half_life_h") for _, sc in items])
+        df["H_shift"] = D_now * decay_integral(lam, 0.0, shift_hours)
+    for j, mat in enumerate(materials):
+        df[f"thickness_cm[{mat}]"] = thickness[:, j]
+    curves = dose_matrix(batch, r_grid, buildup=buildup) if r_grid is not None else None
+    return df, curves
+
+
+def _write(df: pd.DataFrame, path: str) -> None:
+    if path.lower().endswith(".parquet"):
+        df.to_parquet(path, index=False)  # needs pyarrow or fastparquet
+    else:
+        df.to_csv(path, index=False)
+
+
+def run(args) -> int:
+    t0 = time.perf_counter()
+    if args.mu:
+        _init_worker(args.mu)
+    items = load_scenarios(args.db, args.json)
+    t_load = time.perf_counter() - t0
+    r_grid = radius_grid(args.r_min, args.r_max, num=args.num) if args.curves else None
+    chunks = [items[i:i + args.chunk] for i in range(0, len(items), args.chunk)]
+
+    t1 = time.perf_counter()
+    if args.workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(args.mu,)) as pool:
+            results = list(pool.map(evaluate_chunk, chunks, [r_grid] * len(chunks), [args.buildup] * len(chunks),
+                                    [args.shift_hours] * len(chunks)))
+    else:
+        results = [evaluate_chunk(c, r_grid, args.buildup, args.shift_hours) for c in chunks]
+    t_eval = time.perf_counter() - t1
+
+    summary = pd.concat([df for df, _ in results], ignore_index=True) if results else pd.DataFrame()
+    _write(summary, args.out)
+    if args.curves and results:
+        curves = pd.DataFrame(np.vstack([c for _, c in results]), columns=[f"D(r={r:.4g})" for r in r_grid])
+        curves.insert(0, "name", summary["name"])
+        _write(curves, args.curves)
+    total = time.perf_counter() - t0
+
+    n = len(items)
+    rate = n / t_eval if t_eval > 0 else float("inf")
+    print(
+        f"{n} scenarios: load {t_load:.3f} s, evaluate {t_eval:.3f} s ({rate:,.0f} scenarios/s), "
+        f"total {total:.3f} s; μ version {model.mu_version()}",
+        file=sys.stderr,
+    )
+    if n:
+        print(summary["zone"].value_counts().to_string(), file=sys.stderr)
+    return 0
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(prog="python -m shielding", description="Batch evaluation of saved scenarios.")
+    src = p.add_mutually_exclusive_group()
+    src.add_argument("--db", help="SQLite scenario store (default: scenarios/scenarios.db)")
+    src.add_argument("--json", help="scenario file in the my_scenarios.json layout")
+    p.add_argument("--mu", help="μ override file to evaluate against (default: data/mu_override.json)")
+    p.add_argument("--out", default="results.csv", help="summary output, .csv or .parquet")
+    p.add_argument("--curves", help="also write D(r) curves (one row per scenario), .csv or .parquet")
+    p.add_argument("--buildup", action="store_true", help="apply buildup factors from data/buildup.json")
+    p.add_argument("--shift-hours", type=float, help="add H_shift: dose accumulated at r_current over this many hours")
+    p.add_argument("--r-min", type=float, default=0.1)
+    p.add_argument("--r-max", type=float, default=10.0)
+    p.add_argument("--num", type=int, default=400)
+    p.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) - 1))
+    p.add_argument("--chunk", type=int, default=5000, help="scenarios per worker task")
+    return run(p.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from model import ShieldLayer, mu_values
+
+# Cartesian parameter sweeps of D = k·exp(-Σμx)/r². log D is a sum of terms that each depend
+# on only a few axes, so every term is built on its own small grid and the cube is assembled
+# by broadcasting, block by block along the first axis to respect a memory budget.
+
+
+@dataclass
+class SweepCube:
+    # xarray-like labeled cube: values[i, j, ...] belongs to coords[dims[0]][i], coords[dims[1]][j], ...
+    dims: tuple[str, ...]
+    coords: dict[str, np.ndarray]
+    values: np.ndarray
+    attrs: dict = field(default_factory=dict)
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return self.values.shape
+
+    def isel(self, **indexers) -> "SweepCube":
+        # integer selection; selected dims are dropped and recorded in attrs
+        index = tuple(indexers.get(d, slice(None)) for d in self.dims)
+        dims = tuple(d for d in self.dims if d not in indexers)
+        attrs = {**self.attrs, **{d: self.coords[d][i].item() for d, i in indexers.items()}}
+        return SweepCube(dims, {d: self.coords[d] for d in dims}, self.values[index], attrs)
+
+    def sel(self, **labels) -> "SweepCube":
+        # nearest label for numeric dims, exact match for categorical ones
+        indexers = {}
+        for d, v in labels.items():
+            c = self.coords[d]
+            if c.dtype.kind in "fiu":
+                indexers[d] = int(np.argmin(np.abs(c - v)))
+            else:
+                indexers[d] = int(np.flatnonzero(c == v)[0])
+        return self.isel(**indexers)
+
+    def transpose(self, *dims) -> "SweepCube":
+        axes = [self.dims.index(d) for d in dims]
+        return SweepCube(tuple(dims), self.coords, np.transpose(self.values, axes), self.attrs)
+
+    def to_frame(self, name: str = "D") -> pd.DataFrame:
+        idx = pd.MultiIndex.from_product([self.coords[d] for d in self.dims], names=list(self.dims))
+        return pd.DataFrame({name: self.values.ravel()}, index=idx).reset_index()
+
+
+def _place(arr: np.ndarray, axes: list[int], ndim: int) -> np.ndarray:
+    # reshape so arr's axes land on `axes` of an ndim-dimensional broadcast shape
+    shape = [1] * ndim
+    for a, n in zip(axes, arr.shape):
+        shape[a] = n
+    return arr.reshape(shape)
+
+
+def sweep(k=1.0, r=1.0, layers: list[ShieldLayer] = (), thickness: dict | None = None,
+          material: dict | None = None, radiation_type="Гамма", max_bytes: int = 256 * 2**20,
+          dtype=np.float64, out: np.ndarray | None = None) -> SweepCube:
+    # Any of k, r, radiation_type may be a scalar or a 1-D range; thickness={i: range} and
+    # material={i: [names]} sweep layer i of `layers`. Every non-scalar input becomes a dim.
+    thickness = thickness or {}
+    material = material or {}
+    n_layers = max([len(layers)] + [i + 1 for i in list(thickness) + list(material)])
+    base = list(layers) + [ShieldLayer("Свинец", 0.0)] * (n_layers - len(layers))
+
+    dims, coords = [], {}
+
+    def add_dim(name, values):
+        dims.append(name)
+        coords[name] = values
+        return len(dims) - 1
+
+    k_arr = np.atleast_1d(np.asarray(k, dtype=float))
+    k_axis = add_dim("k", k_arr) if np.ndim(k) else None
+    r_arr = np.maximum(np.atleast_1d(np.asarray(r, dtype=float)), 1e-3)
+    r_axis = add_dim("r", np.atleast_1d(np.asarray(r, dtype=float))) if np.ndim(r) else None
+    rt_arr = np.atleast_1d(np.asarray(radiation_type, dtype=object))
+    rt_axis = add_dim("radiation_type", rt_arr.astype(str)) if np.ndim(radiation_type) else None
+
+    # log D = log k - 2 log r - Σ_i μ_i(type, material_i) · x_i
+    terms = [(np.log(k_arr), [k_axis]), (-2.0 * np.log(r_arr), [r_axis])]
+    for i, L in enumerate(base):
+        mats = list(material.get(i, [L.material]))
+        m_axis = add_dim(f"material_{i}", np.array(mats, dtype=object).astype(str)) if i in material else None
+        th = np.atleast_1d(np.asarray(thickness.get(i, L.thickness_cm), dtype=float))
+        t_axis = add_dim(f"thickness_{i}", th) if i in thickness else None
+        th = np.maximum(th, 0.0)
+        mu = mu_values(mats, rt_arr)  # (types, materials)
+        terms.append((-(mu[:, :, None] * th[None, None, :]), [rt_axis, m_axis, t_axis]))
+
+    ndim = len(dims)
+    shape = tuple(len(coords[d]) for d in dims)
+    placed = []
+    for arr, axes in terms:
+        keep = [a for a in axes if a is not None]
+        squeeze = tuple(j for j, a in enumerate(axes) if a is None)
+        arr = arr.reshape([n for j, n in enumerate(arr.shape) if j not in squeeze]) if squeeze else arr
+        placed.append(_place(arr, keep, ndim) if ndim else arr.reshape(()))
+
+    values = np.empty(shape, dtype=dtype) if out is None else out
+    if ndim == 0:
+        values[...] = np.exp(sum(placed))
+    else:
+        # the block is accumulated in float64 before the cast to dtype
+        row_bytes = max(int(np.prod(shape[1:], dtype=np.int64)) * 8, 1)
+        step = max(int(max_bytes // row_bytes), 1)
+        for start in range(0, shape[0], step):
+            sl = slice(start, min(start + step, shape[0]))
+            block = 0.0
+            for arr in placed:
+                block = block + (arr[sl] if arr.shape[0] > 1 else arr)
+            values[sl] = np.exp(block)
+    attrs = {}
+    if k_axis is None:
+        attrs["k"] = float(k_arr[0])
+    if r_axis is None:
+        attrs["r"] = float(np.atleast_1d(np.asarray(r, dtype=float))[0])
+    if rt_axis is None:
+        attrs["radiation_type"] = str(rt_arr[0])
+    return SweepCube(tuple(dims), coords, values, attrs)